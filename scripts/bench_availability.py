@@ -0,0 +1,251 @@
+"""Benchmarks for the availability engine and conflict queries.
+
+    python scripts/bench_availability.py --sizes 1000,100000 --out bench.json
+    python scripts/bench_availability.py --db-url postgresql+psycopg://... --compare bench.json
+
+Prints one JSON document; with ``--compare`` exits 1 when any case got
+slower than the baseline by more than ``--threshold``.
+"""
+from __future__ import annotations
+import argparse
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+from collections.abc import Callable
+from datetime import date, datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import Session
+
+from slotkeeper.core.availability import (
+    ResourceIndex,
+    free_gaps,
+    free_starts,
+    free_starts_batch,
+    generate_slots_for_day,
+)
+from slotkeeper.core.booking.db_repo import DBRepo
+from slotkeeper.core.booking.models import Booking, BookingStatus, Customer
+from slotkeeper.core.booking.repo import InMemoryBookingRepo
+from slotkeeper.core.models import BusySlot, TimeSlot
+from slotkeeper.db.models import Base, BookingStatusEnum
+from slotkeeper.db.models import Booking as DBBooking
+from slotkeeper.db.models import Customer as DBCustomer
+from slotkeeper.db.models import Resource as DBResource
+
+TZ_NAME = "Europe/Moscow"
+TZ = ZoneInfo(TZ_NAME)
+FIRST_DAY = date(2025, 1, 1)
+BOOKINGS_PER_RESOURCE_DAY = 4
+
+WEEKDAY_WEIGHTS = [0.8, 0.8, 0.9, 1.0, 1.4, 1.8, 1.6]
+START_HOURS = list(range(10, 23))
+START_WEIGHTS = [1, 1, 2, 2, 3, 3, 4, 5, 7, 8, 7, 4, 2]
+DURATIONS_H = [2, 3, 4, 5, 6]
+DURATION_WEIGHTS = [5, 4, 3, 1, 1]
+STATUSES = [BookingStatus.confirmed, BookingStatus.pending_review, BookingStatus.expired]
+STATUS_WEIGHTS = [85, 5, 10]
+
+
+def generate_bookings(n: int, *, days: int, seed: int) -> tuple[list[Booking], int]:
+    rng = random.Random(seed)
+    resources = max(1, -(-n // (days * BOOKINGS_PER_RESOURCE_DAY)))
+    calendar = [FIRST_DAY + timedelta(days=i) for i in range(days)]
+    day_weights = [WEEKDAY_WEIGHTS[d.weekday()] for d in calendar]
+    customer = Customer(full_name="Bench", phone="+70000000000", guests=4)
+
+    out: list[Booking] = []
+    for i, day in enumerate(rng.choices(calendar, day_weights, k=n), start=1):
+        start = datetime.combine(day, datetime.min.time(), tzinfo=TZ) + timedelta(
+            hours=rng.choices(START_HOURS, START_WEIGHTS)[0], minutes=rng.choice((0, 30))
+        )
+        hours = rng.choices(DURATIONS_H, DURATION_WEIGHTS)[0]
+        out.append(
+            Booking(
+                id=i,
+                customer=customer,
+                starts_at=start,
+                ends_at=start + timedelta(hours=hours),
+                status=rng.choices(STATUSES, STATUS_WEIGHTS)[0],
+                resource_id=rng.randint(1, resources),
+            )
+        )
+    return out, resources
+
+
+def timed(fn: Callable[[], object], *, repeat: int, number: int = 1) -> dict[str, float]:
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for _ in range(number):
+            fn()
+        samples.append((time.perf_counter() - t0) / number * 1000)
+    return {"min_ms": round(min(samples), 4), "median_ms": round(statistics.median(samples), 4)}
+
+
+def load_db(engine, bookings: list[Booking], resources: int, post_buffer: timedelta) -> None:
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    with Session(engine) as s, s.begin():
+        s.execute(
+            insert(DBResource),
+            [{"id": r, "name": f"R{r}", "is_active": True, "sort_order": r}
+             for r in range(1, resources + 1)],
+        )
+        s.execute(insert(DBCustomer), [{"id": 1, "full_name": "Bench", "phone": "+7", "guests": 4}])
+        rows = [
+            {
+                "id": b.id,
+                "customer_id": 1,
+                "starts_at": b.starts_at,
+                "ends_at": b.ends_at,
+                "busy_until": b.ends_at + post_buffer,
+                "status": BookingStatusEnum(b.status.value),
+                "resource_id": b.resource_id,
+            }
+            for b in bookings
+        ]
+        for i in range(0, len(rows), 10_000):
+            s.execute(insert(DBBooking), rows[i:i + 10_000])
+
+
+def bench_size(n: int, args: argparse.Namespace) -> list[dict]:
+    bookings, resources = generate_bookings(n, days=args.days, seed=args.seed)
+    rng = random.Random(args.seed + 1)
+    step = timedelta(minutes=30)
+    duration = timedelta(hours=2)
+    post_buf = timedelta(minutes=60)
+
+    busy = [
+        BusySlot(b.starts_at, b.ends_at + post_buf, b.resource_id)
+        for b in bookings
+        if b.status in (BookingStatus.confirmed, BookingStatus.pending_review)
+    ]
+    by_day: dict[date, list[BusySlot]] = {}
+    for slot in busy:
+        by_day.setdefault(slot.start.astimezone(TZ).date(), []).append(slot)
+    peak = max(by_day, key=lambda d: len(by_day[d]))
+    peak_busy = by_day[peak]
+    peak_start = datetime.combine(peak, datetime.min.time(), tzinfo=TZ)
+    day = TimeSlot(peak_start, peak_start + timedelta(days=1))
+    month = [peak - timedelta(days=peak.day - 1) + timedelta(days=i) for i in range(28)]
+    month_busy = [b for d in month for b in by_day.get(d, [])]
+    month_start = datetime.combine(month[0], datetime.min.time(), tzinfo=TZ)
+    resource_ids = list(range(1, resources + 1))
+    index = ResourceIndex(peak_busy, resource_ids)
+    probes = [peak_start + timedelta(hours=rng.randint(10, 22)) for _ in range(32)]
+
+    mem = InMemoryBookingRepo()
+    for b in bookings:
+        mem.add(b)
+
+    cases: list[tuple[str, Callable[[], object], int]] = [
+        ("free_starts.peak_day", lambda: free_starts(
+            day, peak_busy, duration=duration, step=step, post_buffer=post_buf), 20),
+        ("free_gaps.peak_day", lambda: free_gaps(
+            day, peak_busy, duration=duration, step=step, post_buffer=post_buf), 20),
+        ("generate_slots_for_day.peak_day", lambda: generate_slots_for_day(
+            peak_start, tz_name=TZ_NAME, busy=peak_busy), 20),
+        ("free_starts_batch.month", lambda: free_starts_batch(
+            month, month_busy, tz_name=TZ_NAME, durations=[duration], step=step,
+            post_buffer=post_buf), 5),
+        ("resource_index.build_peak_day", lambda: ResourceIndex(peak_busy, resource_ids), 20),
+        ("resource_index.free_resources", lambda: [
+            index.free_resources(t, t + duration, post_buffer=post_buf) for t in probes], 5),
+        ("in_memory.conflicts", lambda: [
+            list(mem.conflicts(t, t + duration + post_buf)) for t in probes[:4]], 3),
+    ]
+
+    results = [
+        {"name": name, "n": n, "resources": resources, **timed(fn, repeat=repeat)}
+        for name, fn, repeat in cases
+    ]
+
+    if args.db_url:
+        engine = create_engine(args.db_url, future=True)
+        results.append({"name": "db.load", "n": n, "resources": resources,
+                        **timed(lambda: load_db(engine, bookings, resources, post_buf), repeat=1)})
+        with Session(engine) as s:
+            repo = DBRepo(s, post_buf)
+            db_cases = [
+                ("db.busy_spans.day", lambda: repo.busy_spans(day.start, day.end, post_buf)),
+                ("db.busy_spans.month", lambda: repo.busy_spans(
+                    month_start, month_start + timedelta(days=len(month)), post_buf)),
+                ("db.conflicts", lambda: [
+                    repo.conflicts(t, t + duration + post_buf) for t in probes[:4]]),
+                ("db.conflicts.resource", lambda: [
+                    repo.conflicts(t, t + duration + post_buf, 1) for t in probes[:4]]),
+                ("db.has_conflict", lambda: [
+                    repo.has_conflict(t, t + duration + post_buf, 1) for t in probes]),
+                ("db.resources", repo.resources),
+            ]
+            for name, fn in db_cases:
+                results.append({"name": name, "n": n, "resources": resources,
+                                **timed(fn, repeat=args.repeat)})
+                s.expunge_all()
+        engine.dispose()
+    return results
+
+
+def compare(results: list[dict], baseline_path: str, threshold: float) -> list[dict]:
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = {(r["name"], r["n"]): r for r in json.load(f)["results"]}
+    regressions = []
+    for r in results:
+        old = baseline.get((r["name"], r["n"]))
+        if old and old["min_ms"] > 0 and r["min_ms"] / old["min_ms"] > threshold:
+            regressions.append({
+                "name": r["name"], "n": r["n"],
+                "baseline_ms": old["min_ms"], "current_ms": r["min_ms"],
+                "ratio": round(r["min_ms"] / old["min_ms"], 2),
+            })
+    return regressions
+
+
+def main() -> int:
+    p = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    p.add_argument("--sizes", default="1000,10000,100000",
+                   help="comma separated booking counts, e.g. 1000,1000000")
+    p.add_argument("--days", type=int, default=365)
+    p.add_argument("--seed", type=int, default=42)
+    p.add_argument("--repeat", type=int, default=5)
+    p.add_argument("--db-url", default="",
+                   help="SQLAlchemy URL; tables are DROPPED and recreated (sqlite:///bench.db)")
+    p.add_argument("--out", default="", help="write JSON here instead of stdout")
+    p.add_argument("--compare", default="", help="baseline JSON from a previous run")
+    p.add_argument("--threshold", type=float, default=1.25)
+    args = p.parse_args()
+
+    results: list[dict] = []
+    for n in (int(x) for x in args.sizes.split(",") if x.strip()):
+        results.extend(bench_size(n, args))
+
+    doc: dict = {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "days": args.days,
+            "seed": args.seed,
+            "db": args.db_url.split("://", 1)[0] if args.db_url else None,
+        },
+        "results": results,
+    }
+    if args.compare:
+        doc["regressions"] = compare(results, args.compare, args.threshold)
+
+    text = json.dumps(doc, ensure_ascii=False, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    return 1 if doc.get("regressions") else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,7 @@
 from __future__ import annotations
 import asyncio
 import logging
+from datetime import timedelta
 from aiogram import Bot, Dispatcher
 from aiogram.fsm.storage.memory import MemoryStorage
 from aiogram.fsm.storage.redis import RedisStorage, DefaultKeyBuilder
@@ -9,19 +10,19 @@ from redis.asyncio import from_url as redis_from_url
 from aiogram.enums import ParseMode
 from aiogram.client.default import DefaultBotProperties
 from slotkeeper.config import Settings
-from slotkeeper.core.booking.hold import HoldManager
-from slotkeeper.core.booking.repo import InMemoryBookingRepo
+from slotkeeper.core.availability_cache import AVAILABILITY_CACHE, SHARED_AVAILABILITY_CACHE
 from slotkeeper.handlers.start import router as start_router
 from slotkeeper.handlers.search import router as search_router
 from slotkeeper.handlers.collect import router as collect_router
 from slotkeeper.handlers.admin import router as admin_router
 
-from slotkeeper.core.booking.shared import HOLDS
-from slotkeeper.core.notify.notifier import NOTIFY
-
-
-_REPO = InMemoryBookingRepo
-_HOLDS = HoldManager(repo=_REPO, tz="Europe/Riga")
+from slotkeeper.core.booking.shared import HOLDS, JOBS, repo_scope
+from slotkeeper.core.catalog import RESOURCES, SERVICES
+from slotkeeper.core.lease import RedisLease
+from slotkeeper.core.notify.notifier import HOLD_WARNING, NOTIFY, SEND_MESSAGE
+from slotkeeper.core.notify.outbound import OUTBOUND
+from slotkeeper.db import engine as db_engine
+from slotkeeper.db.session import ROUTER
 
 
 async def run() -> None:
@@ -45,10 +46,46 @@ async def run() -> None:
         storage = MemoryStorage()
         logging.info("FSM storage: Memory (no REDIS_URL)")
 
-    NOTIFY.set_runtime(bot=bot, settings=settings)
+    NOTIFY.set_runtime(settings=settings)
+    OUTBOUND.set_runtime(bot)
+    OUTBOUND.start()
+
+    db_engine.configure(settings)
+    ROUTER.configure(
+        enabled=bool(settings.DATABASE_REPLICA_URL),
+        pin_seconds=settings.REPLICA_PIN_SEC,
+        retry_seconds=settings.REPLICA_RETRY_SEC,
+    )
+
+    AVAILABILITY_CACHE.configure(
+        maxsize=settings.AVAILABILITY_CACHE_SIZE,
+        ttl_seconds=settings.AVAILABILITY_CACHE_TTL_SEC,
+        tz=settings.APP_TIMEZONE,
+        post_buffer=timedelta(minutes=settings.CLEANING_POST_MIN),
+    )
+    if settings.REDIS_URL:
+        SHARED_AVAILABILITY_CACHE.set_runtime(
+            redis=redis_from_url(settings.REDIS_URL),
+            ttl_seconds=settings.AVAILABILITY_CACHE_TTL_SEC,
+        )
+        SHARED_AVAILABILITY_CACHE.start()
+        logging.info("Availability cache: local + Redis")
+
+    SERVICES.ttl_seconds = settings.SERVICE_CATALOG_TTL_SEC
+    async with repo_scope() as repo:
+        await RESOURCES.load(repo)
+        await SERVICES.load(repo)
+    logging.info("Resources: %d", len(RESOURCES.ids()))
 
     HOLDS.tz = settings.APP_TIMEZONE
-    HOLDS.start(interval_seconds=30)
+    if settings.REDIS_URL:
+        HOLDS.set_lease(
+            RedisLease(redis, "slotkeeper:leader:holds", ttl_seconds=settings.HOLD_LEASE_TTL_SEC)
+        )
+    HOLDS.start()
+    JOBS.register(HOLD_WARNING, NOTIFY.send_hold_warning)
+    JOBS.register(SEND_MESSAGE, NOTIFY.send_message)
+    JOBS.start()
 
     dp = Dispatcher(storage=storage)
     dp.include_router(start_router)
@@ -56,7 +93,13 @@ async def run() -> None:
     dp.include_router(search_router)
     dp.include_router(admin_router)
 
-    await dp.start_polling(bot)
+    try:
+        await dp.start_polling(bot)
+    finally:
+        await HOLDS.stop()
+        await JOBS.stop()
+        await OUTBOUND.stop()
+        await db_engine.dispose()
 
 
 if __name__ == "__main__":
@@ -1,8 +1,15 @@
 from __future__ import annotations
-from datetime import datetime, time, timedelta
+from bisect import bisect_right
+from collections.abc import Iterable, Iterator, Sequence
+from dataclasses import dataclass, replace
+from datetime import date, datetime, time, timedelta
 from zoneinfo import ZoneInfo
 
-from .models import TimeSlot, overlaps, with_buffers
+import numpy as np
+
+from .models import BusySlot, TimeSlot
+
+_MINUTE = timedelta(minutes=1)
 
 
 def _day_window(dt: datetime, open_at: time, close_at: time) -> TimeSlot:
@@ -17,6 +24,160 @@ def _day_window(dt: datetime, open_at: time, close_at: time) -> TimeSlot:
     return TimeSlot(start=start, end=end)
 
 
+def merge_busy(busy: Iterable[TimeSlot]) -> list[TimeSlot]:
+    merged: list[TimeSlot] = []
+    for slot in sorted(busy, key=lambda s: s.start):
+        if merged and slot.start <= merged[-1].end:
+            if slot.end > merged[-1].end:
+                merged[-1] = TimeSlot(start=merged[-1].start, end=slot.end)
+        else:
+            merged.append(slot)
+    return merged
+
+
+def _sweep(
+    window: TimeSlot,
+    merged: list[TimeSlot],
+    duration: timedelta,
+    step: timedelta,
+    pre_buffer: timedelta,
+    post_buffer: timedelta,
+) -> Iterator[tuple[datetime, datetime | None]]:
+    i = 0
+    t = window.start
+    while t + duration <= window.end:
+        lo = t - pre_buffer
+        while i < len(merged) and merged[i].end <= lo:
+            i += 1
+        if i < len(merged) and merged[i].start < t + duration + post_buffer:
+            clear_at = merged[i].end + pre_buffer
+            t += -((t - clear_at) // step) * step
+            continue
+        yield t, merged[i].start if i < len(merged) else None
+        t += step
+
+
+def free_starts(
+    window: TimeSlot,
+    busy: Iterable[TimeSlot],
+    *,
+    duration: timedelta,
+    step: timedelta,
+    pre_buffer: timedelta = timedelta(0),
+    post_buffer: timedelta = timedelta(0),
+) -> list[datetime]:
+    """Starts ``t`` on the ``window.start + k * step`` grid such that
+    ``[t, t + duration)`` fits in the window and
+    ``[t - pre_buffer, t + duration + post_buffer)`` touches no busy interval.
+
+    Busy intervals are merged once, then a single cursor walks them in step
+    with the candidates; a conflicting candidate jumps straight past the
+    blocking interval instead of testing every grid point inside it.
+    """
+    merged = merge_busy(busy)
+    return [t for t, _ in _sweep(window, merged, duration, step, pre_buffer, post_buffer)]
+
+
+def free_gaps(
+    window: TimeSlot,
+    busy: Iterable[TimeSlot],
+    *,
+    duration: timedelta,
+    step: timedelta,
+    pre_buffer: timedelta = timedelta(0),
+    post_buffer: timedelta = timedelta(0),
+    horizon: datetime | None = None,
+) -> list[tuple[datetime, timedelta]]:
+    """Same starts as ``free_starts``, each paired with the longest booking
+    that fits there: up to the next busy interval minus ``post_buffer``,
+    capped at ``horizon`` (the window end by default). ``busy`` must cover
+    ``horizon + post_buffer`` for the cap to be meaningful.
+    """
+    limit = horizon or window.end
+    merged = merge_busy(busy)
+    out: list[tuple[datetime, timedelta]] = []
+    for t, next_busy in _sweep(window, merged, duration, step, pre_buffer, post_buffer):
+        end = limit if next_busy is None else min(next_busy - post_buffer, limit)
+        out.append((t, end - t))
+    return out
+
+
+class ResourceIndex:
+    """Busy intervals partitioned by resource, merged and sorted once.
+
+    A span with ``resource_id=None`` occupies the whole venue and is folded
+    into every partition. With no resources the venue is a single partition
+    keyed ``None``. Interval ends of a merged partition are sorted, so
+    ``free_resources`` costs one bisect per resource.
+    """
+
+    def __init__(self, busy: Iterable[TimeSlot], resources: Sequence[int] = ()) -> None:
+        shared: list[TimeSlot] = []
+        own: dict[int, list[TimeSlot]] = {rid: [] for rid in resources}
+        for slot in busy:
+            rid = slot.resource_id if isinstance(slot, BusySlot) else None
+            if rid is None:
+                shared.append(slot)
+            elif rid in own:
+                own[rid].append(slot)
+        if not resources:
+            self.partitions: dict[int | None, list[TimeSlot]] = {None: merge_busy(shared)}
+        else:
+            self.partitions = {rid: merge_busy(own[rid] + shared) for rid in resources}
+        self._ends = {rid: [b.end for b in merged] for rid, merged in self.partitions.items()}
+
+    def free_resources(
+        self,
+        start: datetime,
+        end: datetime,
+        *,
+        pre_buffer: timedelta = timedelta(0),
+        post_buffer: timedelta = timedelta(0),
+    ) -> list[int | None]:
+        lo, hi = start - pre_buffer, end + post_buffer
+        out: list[int | None] = []
+        for rid, merged in self.partitions.items():
+            i = bisect_right(self._ends[rid], lo)
+            if i == len(merged) or merged[i].start >= hi:
+                out.append(rid)
+        return out
+
+    def free_gaps(
+        self,
+        window: TimeSlot,
+        *,
+        duration: timedelta,
+        step: timedelta,
+        pre_buffer: timedelta = timedelta(0),
+        post_buffer: timedelta = timedelta(0),
+        horizon: datetime | None = None,
+    ) -> list[tuple[datetime, timedelta]]:
+        limit = horizon or window.end
+        best: dict[datetime, timedelta] = {}
+        for merged in self.partitions.values():
+            for t, next_busy in _sweep(window, merged, duration, step, pre_buffer, post_buffer):
+                gap = (limit if next_busy is None else min(next_busy - post_buffer, limit)) - t
+                if gap > best.get(t, timedelta.min):
+                    best[t] = gap
+        return sorted(best.items())
+
+    def free_starts(
+        self,
+        window: TimeSlot,
+        *,
+        duration: timedelta,
+        step: timedelta,
+        pre_buffer: timedelta = timedelta(0),
+        post_buffer: timedelta = timedelta(0),
+    ) -> list[datetime]:
+        starts: set[datetime] = set()
+        for merged in self.partitions.values():
+            starts.update(
+                t for t, _ in _sweep(window, merged, duration, step, pre_buffer, post_buffer)
+            )
+        return sorted(starts)
+
+
 def generate_slots_for_day(
     date_local: datetime,
     *,
@@ -33,20 +194,169 @@ def generate_slots_for_day(
     date_local = date_local.astimezone(tz)
 
     day_window = _day_window(date_local, open_at, close_at)
+    starts = free_starts(
+        day_window,
+        busy or [],
+        duration=slot_duration,
+        step=step,
+        pre_buffer=pre_buffer,
+        post_buffer=post_buffer,
+    )
+    return [TimeSlot(start=s, end=s + slot_duration) for s in starts]
+
+
+def _whole_minutes(value: timedelta, name: str) -> int:
+    if value % _MINUTE:
+        raise ValueError(f"{name} must be a whole number of minutes, got {value}")
+    return value // _MINUTE
 
-    candidates: list[TimeSlot] = []
-    cursor = day_window.start
-    while cursor + slot_duration < day_window.end:
-        candidates.append(TimeSlot(cursor, cursor + slot_duration))
-        cursor += step
 
-    if not busy:
-        return candidates
+def _epoch_minute(dt: datetime) -> int:
+    return int(dt.timestamp() // 60)
 
-    free: list[TimeSlot] = []
-    for c in candidates:
-        buffered = with_buffers(c, pre_buffer, post_buffer)
-        if any(overlaps(buffered, b) for b in busy):
+
+@dataclass(frozen=True, slots=True)
+class BatchAvailability:
+    days: tuple[date, ...]
+    windows: tuple[TimeSlot, ...]
+    durations: tuple[timedelta, ...]
+    step: timedelta
+    mask: np.ndarray  # bool, shape (len(durations), len(days), steps per day)
+
+    def _row(self, day: date, duration: timedelta) -> tuple[TimeSlot, np.ndarray]:
+        i = self.days.index(day)
+        return self.windows[i], self.mask[self.durations.index(duration), i]
+
+    def starts(self, day: date, duration: timedelta) -> list[datetime]:
+        window, row = self._row(day, duration)
+        return [window.start + int(k) * self.step for k in np.flatnonzero(row)]
+
+    def counts(self, duration: timedelta) -> np.ndarray:
+        return self.mask[self.durations.index(duration)].sum(axis=1)
+
+    def hours(self) -> np.ndarray:
+        """Local hour of every grid start, shape (days, steps); taken from
+        the same datetimes ``starts`` returns, so DST days line up."""
+        n_steps = self.mask.shape[-1]
+        return np.array(
+            [[(w.start + k * self.step).hour for k in range(n_steps)] for w in self.windows],
+            dtype=np.int64,
+        ).reshape(len(self.windows), n_steps)
+
+
+def free_starts_batch(
+    days: Sequence[date],
+    busy: Iterable[TimeSlot],
+    *,
+    tz_name: str,
+    durations: Sequence[timedelta],
+    step: timedelta,
+    open_at: time = time(0, 0),
+    close_at: time = time(0, 0),
+    pre_buffer: timedelta = timedelta(0),
+    post_buffer: timedelta = timedelta(0),
+) -> BatchAvailability:
+    """Vectorized ``free_starts`` for many days and durations at once.
+
+    Busy intervals are rasterized into one minute-resolution occupancy
+    array spanning every window; a prefix sum over it answers "is anything
+    busy in [a, b)" in O(1) for all candidates together. Busy edges that
+    are not on a whole minute are rounded outwards, so results match the
+    scalar engine exactly for minute-aligned bookings and are conservative
+    otherwise. Days whose UTC offset changes inside the window (DST) are
+    delegated to ``free_starts``.
+    """
+    tz = ZoneInfo(tz_name)
+    step_min = _whole_minutes(step, "step")
+    pre_min = _whole_minutes(pre_buffer, "pre_buffer")
+    post_min = _whole_minutes(post_buffer, "post_buffer")
+    dur_min = np.array([_whole_minutes(d, "duration") for d in durations], dtype=np.int64)
+    busy = list(busy)
+
+    windows = tuple(
+        _day_window(datetime.combine(d, time(0, 0), tzinfo=tz), open_at, close_at)
+        for d in days
+    )
+    if not windows:
+        return BatchAvailability(
+            tuple(days), windows, tuple(durations), step, np.zeros((len(durations), 0, 0), bool)
+        )
+
+    span_min = max(_whole_minutes(w.end - w.start, "window") for w in windows)
+    n_steps = span_min // step_min + 1
+    offsets = np.arange(n_steps, dtype=np.int64) * step_min
+
+    t0 = min(_epoch_minute(w.start) for w in windows) - pre_min
+    t1 = max(_epoch_minute(w.end) for w in windows) + post_min
+    length = t1 - t0
+
+    diff = np.zeros(length + 1, dtype=np.int32)
+    if busy:
+        starts = np.array([b.start.timestamp() for b in busy]) // 60
+        ends = -(-np.array([b.end.timestamp() for b in busy]) // 60)
+        starts = np.clip(starts.astype(np.int64) - t0, 0, length)
+        ends = np.clip(ends.astype(np.int64) - t0, 0, length)
+        keep = starts < ends
+        np.add.at(diff, starts[keep], 1)
+        np.add.at(diff, ends[keep], -1)
+    occupied = np.cumsum(diff[:-1]) > 0
+    prefix = np.concatenate(([0], np.cumsum(occupied, dtype=np.int64)))
+
+    mask = np.zeros((len(durations), len(windows), n_steps), dtype=bool)
+    uniform: list[int] = []
+    for i, w in enumerate(windows):
+        if (w.start - pre_buffer).utcoffset() == (w.end + post_buffer).utcoffset():
+            uniform.append(i)
             continue
-        free.append(c)
-    return free
+        for j, d in enumerate(durations):
+            for t in free_starts(
+                w, busy, duration=d, step=step, pre_buffer=pre_buffer, post_buffer=post_buffer
+            ):
+                mask[j, i, (t - w.start) // step] = True
+
+    if uniform:
+        idx = np.array(uniform)
+        base = np.array([_epoch_minute(windows[i].start) - t0 for i in uniform], dtype=np.int64)
+        span = np.array(
+            [(windows[i].end - windows[i].start) // _MINUTE for i in uniform], dtype=np.int64
+        )
+        cand = base[:, None] + offsets[None, :]
+        for j, d in enumerate(dur_min):
+            fits = offsets[None, :] + d <= span[:, None]
+            lo = np.clip(cand - pre_min, 0, length)
+            hi = np.clip(cand + d + post_min, 0, length)
+            mask[j, idx] = fits & (prefix[hi] == prefix[lo])
+
+    return BatchAvailability(tuple(days), windows, tuple(durations), step, mask)
+
+
+def free_starts_batch_any(
+    days: Sequence[date],
+    index: ResourceIndex,
+    *,
+    tz_name: str,
+    durations: Sequence[timedelta],
+    step: timedelta,
+    open_at: time = time(0, 0),
+    close_at: time = time(0, 0),
+    pre_buffer: timedelta = timedelta(0),
+    post_buffer: timedelta = timedelta(0),
+) -> BatchAvailability:
+    """``free_starts_batch`` over every partition of ``index``, OR-ed: a start
+    is free when at least one resource can take it."""
+    batches = [
+        free_starts_batch(
+            days,
+            merged,
+            tz_name=tz_name,
+            durations=durations,
+            step=step,
+            open_at=open_at,
+            close_at=close_at,
+            pre_buffer=pre_buffer,
+            post_buffer=post_buffer,
+        )
+        for merged in index.partitions.values()
+    ]
+    mask = np.logical_or.reduce([b.mask for b in batches])
+    return replace(batches[0], mask=mask)
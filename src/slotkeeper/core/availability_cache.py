@@ -0,0 +1,302 @@
+from __future__ import annotations
+import asyncio
+import itertools
+import logging
+import struct
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Iterable
+from datetime import date, datetime, timedelta
+from zoneinfo import ZoneInfo
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from .models import BusySlot, TimeSlot
+
+
+class AvailabilityCache:
+    """Per-date cache of busy spans.
+
+    Every date carries a write version. Readers take ``version(day)`` before
+    querying the database and hand it back to ``put``; the value is kept only
+    while nobody has invalidated that date in between, so a read that raced a
+    commit can never be served later.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 256,
+        ttl_seconds: float = 300.0,
+        tz: str = "Europe/Moscow",
+        post_buffer: timedelta = timedelta(0),
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self.tz = tz
+        self.post_buffer = post_buffer
+        self._clock = clock
+        self._seq = itertools.count(1)
+        self._versions: dict[date, int] = {}
+        self._entries: OrderedDict[date, tuple[int, float, tuple[TimeSlot, ...]]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def configure(
+        self, *, maxsize: int, ttl_seconds: float, tz: str, post_buffer: timedelta
+    ) -> None:
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self.tz = tz
+        self.post_buffer = post_buffer
+        self.clear()
+
+    def version(self, day: date) -> int:
+        return self._versions.get(day, 0)
+
+    def get(self, day: date) -> tuple[TimeSlot, ...] | None:
+        entry = self._entries.get(day)
+        if entry is None:
+            self.misses += 1
+            return None
+        version, stored_at, busy = entry
+        if version != self.version(day) or self._clock() - stored_at > self.ttl_seconds:
+            del self._entries[day]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(day)
+        self.hits += 1
+        return busy
+
+    def put(self, day: date, version: int, busy: Iterable[TimeSlot]) -> None:
+        if version != self.version(day) or self.maxsize <= 0:
+            return
+        self._entries[day] = (version, self._clock(), tuple(busy))
+        self._entries.move_to_end(day)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, days: Iterable[date]) -> None:
+        for day in days:
+            self._versions[day] = next(self._seq)
+            self._entries.pop(day, None)
+            self.invalidations += 1
+
+    def invalidate_spans(self, spans: Iterable[TimeSlot]) -> set[date]:
+        tz = ZoneInfo(self.tz)
+        days: set[date] = set()
+        for span in spans:
+            first = span.start.astimezone(tz).date()
+            last = (span.end + self.post_buffer - timedelta(microseconds=1)).astimezone(tz).date()
+            days.update(first + timedelta(days=i) for i in range((last - first).days + 1))
+        self.invalidate(days)
+        return days
+
+    def clear(self) -> None:
+        self.invalidate(list(self._entries))
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+
+def _day_start_ts(day: date, tz_name: str) -> int:
+    return int(datetime.combine(day, datetime.min.time()).replace(tzinfo=ZoneInfo(tz_name)).timestamp())
+
+
+def encode_busy(day: date, tz_name: str, busy: Iterable[TimeSlot]) -> bytes:
+    base = _day_start_ts(day, tz_name)
+    fields: list[int] = []
+    for slot in busy:
+        fields.append(int(slot.start.timestamp()) - base)
+        fields.append(int(slot.end.timestamp()) - base)
+        fields.append(getattr(slot, "resource_id", None) or 0)
+    return struct.pack(f"<{len(fields)}I", *fields)
+
+
+def decode_busy(day: date, tz_name: str, blob: bytes) -> tuple[BusySlot, ...]:
+    tz = ZoneInfo(tz_name)
+    base = _day_start_ts(day, tz_name)
+    fields = struct.unpack(f"<{len(blob) // 4}I", blob)
+    return tuple(
+        BusySlot(
+            start=datetime.fromtimestamp(base + fields[i], tz),
+            end=datetime.fromtimestamp(base + fields[i + 1], tz),
+            resource_id=fields[i + 2] or None,
+        )
+        for i in range(0, len(fields), 3)
+    )
+
+
+_PUT_IF_VERSION = """
+if (redis.call('GET', KEYS[1]) or '0') == ARGV[1] then
+    redis.call('SET', KEYS[2], ARGV[2], 'EX', ARGV[3])
+    return 1
+end
+return 0
+"""
+
+
+class SharedAvailabilityCache:
+    """Redis tier shared by every bot process, sitting behind the local cache.
+
+    Entries are the ``encode_busy`` blobs of a date. Writers bump the date's
+    Redis version, drop the entry and publish the date on a channel; every
+    replica's listener invalidates its local tier on that message and hands
+    the dates to ``on_invalidate``.
+
+    The tier is best-effort: a ``RedisError`` on a read or a fill is logged
+    and callers fall through to the database. A failed invalidation keeps
+    its dates pending (this process skips their shared entries) and is
+    retried with backoff until it gets through.
+    """
+
+    def __init__(self, local: AvailabilityCache, prefix: str = "slotkeeper:avail:v2") -> None:
+        self.local = local
+        self.prefix = prefix
+        self.channel = f"{prefix}:invalidate"
+        self.redis: Redis | None = None
+        self.ttl_seconds = 300
+        self._pending: set[date] = set()
+        self._unsent: set[date] = set()
+        self._tasks: set[asyncio.Task] = set()
+        self._retry: asyncio.Task | None = None
+        self.retry_seconds = 1.0
+        self._listener: asyncio.Task | None = None
+        self.on_invalidate: Callable[[list[date]], None] | None = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.redis is not None
+
+    def set_runtime(self, redis: Redis, ttl_seconds: int) -> None:
+        self.redis = redis
+        self.ttl_seconds = ttl_seconds
+
+    def _ver_key(self, day: date) -> str:
+        return f"{self.prefix}:ver:{day.isoformat()}"
+
+    def _busy_key(self, day: date) -> str:
+        return f"{self.prefix}:busy:{day.isoformat()}"
+
+    async def versions(self, days: list[date]) -> dict[date, int]:
+        if not self.redis or not days:
+            return {}
+        try:
+            raw = await self.redis.mget([self._ver_key(d) for d in days])
+        except RedisError as exc:
+            logging.warning("availability cache: versions unavailable: %s", exc)
+            return {}
+        return {d: int(v or 0) for d, v in zip(days, raw)}
+
+    async def get_many(self, days: list[date], tz_name: str) -> dict[date, tuple[TimeSlot, ...]]:
+        days = [d for d in days if d not in self._pending]
+        if not self.redis or not days:
+            return {}
+        try:
+            raw = await self.redis.mget([self._busy_key(d) for d in days])
+        except RedisError as exc:
+            logging.warning("availability cache: shared read failed, using the database: %s", exc)
+            return {}
+        return {d: decode_busy(d, tz_name, blob) for d, blob in zip(days, raw) if blob is not None}
+
+    async def put_many(
+        self, entries: dict[date, tuple[int, Iterable[TimeSlot]]], tz_name: str
+    ) -> None:
+        if not self.redis or not entries:
+            return
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for day, (version, busy) in entries.items():
+                pipe.eval(
+                    _PUT_IF_VERSION,
+                    2,
+                    self._ver_key(day),
+                    self._busy_key(day),
+                    str(version),
+                    encode_busy(day, tz_name, busy),
+                    self.ttl_seconds,
+                )
+            try:
+                await pipe.execute()
+            except RedisError as exc:
+                logging.warning("availability cache: shared fill failed: %s", exc)
+
+    async def invalidate(self, days: set[date]) -> None:
+        if not self.redis or not days:
+            return
+        try:
+            async with self.redis.pipeline(transaction=True) as pipe:
+                for day in days:
+                    pipe.incr(self._ver_key(day))
+                    pipe.delete(self._busy_key(day))
+                pipe.publish(self.channel, ",".join(d.isoformat() for d in sorted(days)))
+                await pipe.execute()
+        except RedisError as exc:
+            logging.warning(
+                "availability cache: invalidating %s failed, will retry: %s",
+                ",".join(d.isoformat() for d in sorted(days)),
+                exc,
+            )
+            self._unsent.update(days)
+            if self._retry is None or self._retry.done():
+                self._retry = asyncio.get_running_loop().create_task(self._retry_unsent())
+        else:
+            self._pending.difference_update(days - self._unsent)
+
+    async def _retry_unsent(self, max_delay: float = 30.0) -> None:
+        delay = self.retry_seconds
+        while self._unsent and self.redis is not None:
+            await asyncio.sleep(delay)
+            days, self._unsent = self._unsent, set()
+            await self.invalidate(days)
+            delay = min(delay * 2, max_delay)
+
+    def invalidate_later(self, days: set[date]) -> None:
+        if not self.redis or not days:
+            return
+        self._pending.update(days)
+        task = asyncio.get_running_loop().create_task(self.invalidate(days))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def start(self) -> None:
+        if not self.redis or (self._listener and not self._listener.done()):
+            return
+        self._listener = asyncio.create_task(self._listen())
+
+    async def _listen(self) -> None:
+        while self.redis is not None:
+            pubsub = self.redis.pubsub()
+            try:
+                await pubsub.subscribe(self.channel)
+                self.local.clear()
+                async for message in pubsub.listen():
+                    if message["type"] != "message":
+                        continue
+                    data = message["data"]
+                    if isinstance(data, bytes):
+                        data = data.decode()
+                    days = [date.fromisoformat(d) for d in data.split(",")]
+                    self.local.invalidate(days)
+                    if self.on_invalidate is not None:
+                        self.on_invalidate(days)
+            except RedisError:
+                logging.exception("availability cache: invalidation channel lost, retrying")
+                self.local.clear()
+                await asyncio.sleep(1)
+            finally:
+                await pubsub.aclose()
+
+
+AVAILABILITY_CACHE = AvailabilityCache()
+SHARED_AVAILABILITY_CACHE = SharedAvailabilityCache(AVAILABILITY_CACHE)
@@ -1,13 +1,43 @@
-from sqlalchemy import select, and_
-from sqlalchemy.orm import Session, joinedload, selectinload
+from collections.abc import AsyncIterator, Iterable, Iterator
+from dataclasses import replace
+from datetime import datetime, timedelta
+
+from sqlalchemy import (
+    BigInteger,
+    and_,
+    delete,
+    exists,
+    func,
+    insert,
+    literal,
+    or_,
+    select,
+    tuple_,
+    update,
+)
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
 
 from slotkeeper.db.models import (
     Booking as DBBooking,
     Customer as DBCustomer,
     BookingService,
+    Resource,
+    ScheduledJob,
     Service,
 )
-from slotkeeper.core.booking.models import Booking, Customer, BookingStatus
+from slotkeeper.core.booking.models import (
+    ACTIVE_STATUSES,
+    MAX_BOOKING_LENGTH,
+    Booking,
+    Customer,
+    BookingStatus,
+)
+from slotkeeper.core.jobs import Job
+from slotkeeper.core.models import BusySlot, TimeSlot
+from slotkeeper.utils.validators import normalize_phone
 
 def _to_domain(db: DBBooking) -> Booking:
     raw = db.status
@@ -19,6 +49,7 @@ def _to_domain(db: DBBooking) -> Booking:
         full_name=db.customer.full_name,
         phone=db.customer.phone,
         guests=db.customer.guests,
+        birth_date=db.customer.birth_date,
     )
 
     return Booking(
@@ -29,103 +60,537 @@ def _to_domain(db: DBBooking) -> Booking:
         status=status,
         hold_deadline=db.hold_deadline,
         client_chat_id=db.client_chat_id,
+        resource_id=db.resource_id,
+    )
+
+
+def _busy_spans_stmt(start_dt: datetime, end_dt: datetime, post_buffer: timedelta):
+    return (
+        select(DBBooking.starts_at, DBBooking.ends_at, DBBooking.resource_id)
+        .where(
+            DBBooking.status.in_([s.value for s in ACTIVE_STATUSES]),
+            DBBooking.starts_at < end_dt,
+            DBBooking.ends_at > start_dt - post_buffer,
+            DBBooking.ends_at < end_dt + MAX_BOOKING_LENGTH,
+        )
+        .order_by(DBBooking.starts_at)
+        .execution_options(yield_per=500)
+    )
+
+
+def _pending_hold(now: datetime | None = None):
+    # inline literal so the planner can match ix_bookings_hold_deadline_pending
+    pending = literal(BookingStatus.pending_review.value, DBBooking.status.type, literal_execute=True)
+    if now is None:
+        return and_(DBBooking.status == pending, DBBooking.hold_deadline.is_not(None))
+    return and_(DBBooking.status == pending, DBBooking.hold_deadline <= now)
+
+
+def _expire_holds_stmt(now: datetime):
+    return (
+        update(DBBooking)
+        .where(_pending_hold(now))
+        .values(status=BookingStatus.expired.value)
+        .returning(DBBooking.id, DBBooking.starts_at, DBBooking.ends_at, DBBooking.client_chat_id)
+        .execution_options(synchronize_session=False)
+    )
+
+
+_BOOKING_ROW = (
+    DBBooking.id,
+    DBBooking.starts_at,
+    DBBooking.ends_at,
+    DBBooking.status,
+    DBBooking.hold_deadline,
+    DBBooking.client_chat_id,
+    DBBooking.resource_id,
+    DBCustomer.full_name,
+    DBCustomer.phone,
+    DBCustomer.guests,
+    DBCustomer.birth_date,
+)
+
+
+def _booking_stmt(booking_id: int):
+    return (
+        select(*_BOOKING_ROW)
+        .join(DBCustomer, DBCustomer.id == DBBooking.customer_id)
+        .where(DBBooking.id == booking_id)
+    )
+
+
+def _overlap_clause(start_dt: datetime, end_dt: datetime, resource_id: int | None):
+    clause = and_(
+        DBBooking.status.in_([s.value for s in ACTIVE_STATUSES]),
+        DBBooking.starts_at < end_dt,
+        DBBooking.ends_at > start_dt,
+        DBBooking.ends_at < end_dt + MAX_BOOKING_LENGTH,
     )
+    if resource_id is not None:
+        clause = and_(
+            clause, or_(DBBooking.resource_id == resource_id, DBBooking.resource_id.is_(None))
+        )
+    return clause
+
+
+def _conflicts_stmt(start_dt: datetime, end_dt: datetime, resource_id: int | None = None):
+    return (
+        select(*_BOOKING_ROW)
+        .join(DBCustomer, DBCustomer.id == DBBooking.customer_id)
+        .where(_overlap_clause(start_dt, end_dt, resource_id))
+        .order_by(DBBooking.starts_at, DBBooking.id)
+    )
+
+
+def _has_conflict_stmt(start_dt: datetime, end_dt: datetime, resource_id: int | None = None):
+    return select(exists().where(_overlap_clause(start_dt, end_dt, resource_id)))
+
+
+def _check_length(booking: Booking) -> None:
+    if booking.ends_at - booking.starts_at > MAX_BOOKING_LENGTH:
+        raise ValueError(f"Booking longer than {MAX_BOOKING_LENGTH}")
+
+
+def _customer_upsert_stmt(customer: Customer, dialect: str):
+    insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+    stmt = insert(DBCustomer).values(
+        full_name=customer.full_name,
+        phone=normalize_phone(customer.phone) or customer.phone,
+        guests=customer.guests,
+        birth_date=customer.birth_date,
+    )
+    return stmt.on_conflict_do_update(
+        index_elements=[DBCustomer.phone],
+        set_={
+            "full_name": stmt.excluded.full_name,
+            "guests": stmt.excluded.guests,
+            "birth_date": func.coalesce(stmt.excluded.birth_date, DBCustomer.birth_date),
+        },
+    )
+
+
+def _create_hold_stmt(customer, values: dict, services: list[int]):
+    cust = customer.cte("c")
+    columns = DBBooking.__table__.c
+    book = (
+        insert(DBBooking)
+        .from_select(
+            ["customer_id", *values],
+            select(cust.c.id, *(literal(v, columns[k].type) for k, v in values.items())),
+        )
+        .returning(DBBooking.id)
+        .cte("b")
+    )
+    svc = insert(BookingService).from_select(
+        ["booking_id", "service_id"],
+        select(book.c.id, func.unnest(literal(services, postgresql.ARRAY(BigInteger)))),
+    )
+    return select(book.c.id).add_cte(svc.cte("s"))
+
+
+def _bookings_page_stmt(
+    after: tuple[datetime, int] | None,
+    limit: int,
+    statuses: Iterable[BookingStatus] | None,
+    start: datetime | None,
+    end: datetime | None,
+    client_chat_id: int | None,
+):
+    stmt = (
+        select(*_BOOKING_ROW)
+        .join(DBCustomer, DBCustomer.id == DBBooking.customer_id)
+        .order_by(DBBooking.starts_at, DBBooking.id)
+        .limit(limit)
+    )
+    if after is not None:
+        stmt = stmt.where(tuple_(DBBooking.starts_at, DBBooking.id) > tuple_(*after))
+    if statuses is not None:
+        stmt = stmt.where(DBBooking.status.in_([BookingStatus(s).value for s in statuses]))
+    if start is not None:
+        stmt = stmt.where(DBBooking.starts_at >= start)
+    if end is not None:
+        stmt = stmt.where(DBBooking.starts_at < end)
+    if client_chat_id is not None:
+        stmt = stmt.where(DBBooking.client_chat_id == client_chat_id)
+    return stmt
+
+
+def _row_to_domain(row) -> Booking:
+    (booking_id, starts_at, ends_at, status, hold_deadline, chat_id, resource_id,
+     full_name, phone, guests, birth_date) = row
+    return Booking(
+        id=booking_id,
+        customer=Customer(full_name=full_name, phone=phone, guests=guests, birth_date=birth_date),
+        starts_at=starts_at,
+        ends_at=ends_at,
+        status=BookingStatus(getattr(status, "value", status)),
+        hold_deadline=hold_deadline,
+        client_chat_id=chat_id,
+        resource_id=resource_id,
+    )
+
+
+def _to_busy(row, start_dt: datetime, end_dt: datetime, post_buffer: timedelta) -> BusySlot:
+    starts_at, ends_at, resource_id = row
+    return BusySlot(
+        start=max(starts_at, start_dt),
+        end=min(ends_at + post_buffer, end_dt),
+        resource_id=resource_id,
+    )
+
+
+def _claim_jobs_stmt(now: datetime, limit: int, lock_for: timedelta):
+    due = (
+        select(ScheduledJob.id)
+        .where(ScheduledJob.run_at <= now)
+        .order_by(ScheduledJob.run_at)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    return (
+        update(ScheduledJob)
+        .where(ScheduledJob.id.in_(due.scalar_subquery()))
+        .values(run_at=now + lock_for, attempts=ScheduledJob.attempts + 1)
+        .returning(ScheduledJob.id, ScheduledJob.kind, ScheduledJob.payload, ScheduledJob.attempts)
+        .execution_options(synchronize_session=False)
+    )
+
+
+EXCLUSION_VIOLATION = "23P01"
+
+
+def _is_exclusion_violation(exc: IntegrityError) -> bool:
+    orig = exc.orig
+    code = getattr(orig, "sqlstate", None) or getattr(orig, "pgcode", None)
+    return code == EXCLUSION_VIOLATION
 
 
 class DBRepo:
-    def __init__(self, session: Session):
+    def __init__(self, session: Session, post_buffer: timedelta):
         self.s = session
+        self.post_buffer = post_buffer
+        self.touched: list[TimeSlot] = []
+        self.chats: set[int] = set()
+        self.enqueued: list[int] = []
+
+    def _touch(self, start: datetime, end: datetime, chat_id: int | None) -> None:
+        self.touched.append(TimeSlot(start=start, end=end))
+        if chat_id is not None:
+            self.chats.add(chat_id)
 
     def get(self, booking_id: int) -> Booking | None:
-        stmt = (
-            select(DBBooking)
-            .where(DBBooking.id == booking_id)
-            .options(
-                joinedload(DBBooking.customer),
-                selectinload(DBBooking.services).joinedload(BookingService.service),
-            )
-        )
-        row = self.s.execute(stmt).unique().scalar_one_or_none()
-        return _to_domain(row) if row else None
+        row = self.s.execute(_booking_stmt(booking_id)).first()
+        return _row_to_domain(row) if row else None
+
+    def bookings_page(
+        self,
+        after: tuple[datetime, int] | None = None,
+        *,
+        limit: int = 500,
+        statuses: Iterable[BookingStatus] | None = None,
+        start: datetime | None = None,
+        end: datetime | None = None,
+        client_chat_id: int | None = None,
+    ) -> list[Booking]:
+        stmt = _bookings_page_stmt(after, limit, statuses, start, end, client_chat_id)
+        return [_row_to_domain(row) for row in self.s.execute(stmt)]
+
+    def iter_bookings(self, *, page_size: int = 500, **filters) -> Iterator[Booking]:
+        """Bookings ordered by ``(starts_at, id)``, fetched ``page_size`` at a
+        time by keyset, so memory stays flat however large the table is.
+        Filters are those of ``bookings_page``."""
+        after = None
+        while True:
+            page = self.bookings_page(after, limit=page_size, **filters)
+            yield from page
+            if len(page) < page_size:
+                return
+            after = (page[-1].starts_at, page[-1].id)
 
-    def all(self) -> list[Booking]:
+    def iter_busy_spans(
+        self, start_dt: datetime, end_dt: datetime, post_buffer: timedelta
+    ) -> Iterator[BusySlot]:
+        for row in self.s.execute(_busy_spans_stmt(start_dt, end_dt, post_buffer)):
+            yield _to_busy(row, start_dt, end_dt, post_buffer)
+
+    def busy_spans(
+        self, start_dt: datetime, end_dt: datetime, post_buffer: timedelta
+    ) -> list[BusySlot]:
+        return list(self.iter_busy_spans(start_dt, end_dt, post_buffer))
+
+    def resources(self) -> list[tuple[int, str]]:
         stmt = (
-            select(DBBooking)
-            .options(
-                joinedload(DBBooking.customer),
-                selectinload(DBBooking.services).joinedload(BookingService.service),
-            )
-            .order_by(DBBooking.id.desc())
+            select(Resource.id, Resource.name)
+            .where(Resource.is_active.is_(True))
+            .order_by(Resource.sort_order, Resource.id)
         )
-        rows = self.s.execute(stmt).unique().scalars().all()
-        return [_to_domain(r) for r in rows]
+        return [(rid, name) for rid, name in self.s.execute(stmt)]
 
-    def conflicts(self, start_dt, end_dt) -> list[Booking]:
-        stmt = select(DBBooking).where(
-            and_(DBBooking.starts_at < end_dt, DBBooking.ends_at > start_dt)
+    def services(self, include_inactive: bool = False) -> list[tuple[int, str, bool, bool]]:
+        stmt = select(Service.id, Service.name, Service.adult_only, Service.is_active).order_by(
+            Service.sort_order, Service.id
         )
-        rows = self.s.execute(stmt).scalars().all()
-        return [_to_domain(r) for r in rows]
-
-    def add(self, booking: Booking, services: list[str] | None = None) -> Booking:
-        db_cust = DBCustomer(
-            full_name=booking.customer.full_name,
-            phone=booking.customer.phone,
-            guests=booking.customer.guests,
+        if not include_inactive:
+            stmt = stmt.where(Service.is_active.is_(True))
+        return [tuple(row) for row in self.s.execute(stmt)]
+
+    def conflicts(self, start_dt, end_dt, resource_id: int | None = None) -> list[Booking]:
+        """Active bookings overlapping ``[start_dt, end_dt)``."""
+        return [
+            _row_to_domain(row)
+            for row in self.s.execute(_conflicts_stmt(start_dt, end_dt, resource_id))
+        ]
+
+    def has_conflict(self, start_dt, end_dt, resource_id: int | None = None) -> bool:
+        return self.s.scalar(_has_conflict_stmt(start_dt, end_dt, resource_id))
+
+    def pending_holds(self) -> list[tuple[datetime, int]]:
+        stmt = select(DBBooking.hold_deadline, DBBooking.id).where(_pending_hold())
+        return [(deadline, booking_id) for deadline, booking_id in self.s.execute(stmt)]
+
+    def mark_expired_if_held_and_due(self, now: datetime) -> list[int]:
+        """Expire every hold due by ``now`` in one ``UPDATE ... RETURNING``."""
+        expired: list[int] = []
+        for booking_id, starts_at, ends_at, chat_id in self.s.execute(_expire_holds_stmt(now)):
+            self._touch(starts_at, ends_at, chat_id)
+            expired.append(booking_id)
+        return expired
+
+    def enqueue_job(self, kind: str, payload: dict, run_at: datetime) -> int:
+        stmt = insert(ScheduledJob).values(kind=kind, payload=payload, run_at=run_at, attempts=0)
+        job_id = self.s.execute(stmt.returning(ScheduledJob.id)).scalar_one()
+        self.enqueued.append(job_id)
+        return job_id
+
+    def claim_jobs(self, now: datetime, limit: int, lock_for: timedelta) -> list[Job]:
+        """Lease up to ``limit`` due jobs by moving their ``run_at`` past
+        ``now + lock_for``; rows locked by another dispatcher are skipped.
+        Jobs come back in insertion order."""
+        rows = self.s.execute(_claim_jobs_stmt(now, limit, lock_for))
+        return sorted((Job(*row) for row in rows), key=lambda job: job.id)
+
+    def finish_jobs(self, job_ids: list[int]) -> None:
+        if job_ids:
+            self.s.execute(delete(ScheduledJob).where(ScheduledJob.id.in_(job_ids)))
+
+    def extend_jobs(self, job_ids: list[int], run_at: datetime) -> None:
+        if job_ids:
+            self.s.execute(
+                update(ScheduledJob).where(ScheduledJob.id.in_(job_ids)).values(run_at=run_at)
+            )
+
+    def retry_job(self, job_id: int, run_at: datetime) -> None:
+        self.s.execute(
+            update(ScheduledJob).where(ScheduledJob.id == job_id).values(run_at=run_at)
         )
-        self.s.add(db_cust)
-        self.s.flush()
+
+    def next_job_at(self) -> datetime | None:
+        return self.s.scalar(select(func.min(ScheduledJob.run_at)))
+
+    def upsert_customer(self, customer: Customer) -> DBCustomer:
+        stmt = _customer_upsert_stmt(customer, self.s.get_bind().dialect.name)
+        return self.s.scalars(
+            stmt.returning(DBCustomer), execution_options={"populate_existing": True}
+        ).one()
+
+    def add(self, booking: Booking, services: list[int] | None = None) -> Booking:
+        _check_length(booking)
+        db_cust = self.upsert_customer(booking.customer)
 
         status_val = booking.status.value if hasattr(booking.status, "value") else str(booking.status)
         db_booking = DBBooking(
-            customer_id=db_cust.id,
+            customer=db_cust,
             starts_at=booking.starts_at,
             ends_at=booking.ends_at,
             status=status_val,
             hold_deadline=booking.hold_deadline,
             client_chat_id=booking.client_chat_id,
+            resource_id=booking.resource_id,
+            busy_until=booking.ends_at + self.post_buffer,
         )
         self.s.add(db_booking)
         self.s.flush()
+        self._touch(booking.starts_at, booking.ends_at, booking.client_chat_id)
 
-        if services:
-            srv_rows = (
-                self.s.execute(select(Service).where(Service.name.in_(services)))
-                .scalars()
-                .all()
-            )
-            for srv in srv_rows:
-                self.s.add(BookingService(booking_id=db_booking.id, service_id=srv.id))
+        for service_id in services or ():
+            self.s.add(BookingService(booking_id=db_booking.id, service_id=service_id))
 
         self.s.flush()
         return _to_domain(db_booking)
 
-    def update(self, booking: Booking, services: list[str] | None = None) -> Booking:
+    def create_hold(self, booking: Booking, services: list[int] | None = None) -> Booking | None:
+        """Write a held booking, its customer and services; ``None`` if the
+        slot is taken.
+
+        On Postgres this is one statement: the customer upsert, the booking
+        insert and the ``booking_services`` insert are chained CTEs, so
+        the exclusion constraints decide the overlap in the same round trip.
+        The writes run in a savepoint, so a taken slot leaves the
+        surrounding transaction usable for the next attempt.
+        """
+        _check_length(booking)
+        values = {
+            "starts_at": booking.starts_at,
+            "ends_at": booking.ends_at,
+            "busy_until": booking.ends_at + self.post_buffer,
+            "status": BookingStatus(booking.status).value,
+            "hold_deadline": booking.hold_deadline,
+            "client_chat_id": booking.client_chat_id,
+            "resource_id": booking.resource_id,
+        }
+        services = list(services or ())
+        dialect = self.s.get_bind().dialect.name
+        customer = _customer_upsert_stmt(booking.customer, dialect).returning(DBCustomer.id)
+        try:
+            with self.s.begin_nested():
+                if dialect == "postgresql":
+                    booking_id = self.s.execute(
+                        _create_hold_stmt(customer, values, services)
+                    ).scalar_one()
+                else:
+                    customer_id = self.s.execute(customer).scalar_one()
+                    booking_id = self.s.execute(
+                        insert(DBBooking).values(customer_id=customer_id, **values).returning(DBBooking.id)
+                    ).scalar_one()
+                    if services:
+                        self.s.execute(
+                            insert(BookingService),
+                            [{"booking_id": booking_id, "service_id": sid} for sid in services],
+                        )
+        except IntegrityError as exc:
+            if not _is_exclusion_violation(exc):
+                raise
+            return None
+
+        self._touch(booking.starts_at, booking.ends_at, booking.client_chat_id)
+        phone = normalize_phone(booking.customer.phone) or booking.customer.phone
+        return replace(booking, id=booking_id, customer=replace(booking.customer, phone=phone))
+
+    def update(self, booking: Booking, services: list[int] | None = None) -> Booking:
         db = self.s.get(DBBooking, booking.id)
         if not db:
             raise ValueError(f"Booking #{booking.id} not found")
+        _check_length(booking)
 
+        self._touch(db.starts_at, db.ends_at, db.client_chat_id)
+        self._touch(booking.starts_at, booking.ends_at, booking.client_chat_id)
+        if (db.starts_at, db.ends_at) != (booking.starts_at, booking.ends_at):
+            db.busy_until = booking.ends_at + self.post_buffer
         db.starts_at = booking.starts_at
         db.ends_at = booking.ends_at
         db.hold_deadline = booking.hold_deadline
         db.client_chat_id = booking.client_chat_id
+        db.resource_id = booking.resource_id
         db.status = booking.status.value if hasattr(booking.status, "value") else str(booking.status)
 
-        if db.customer:
-            db.customer.full_name = booking.customer.full_name
-            db.customer.phone = booking.customer.phone
-            db.customer.guests = booking.customer.guests
+        cust = booking.customer
+        phone = normalize_phone(cust.phone) or cust.phone
+        current = db.customer
+        if (current.full_name, current.phone, current.guests, current.birth_date) != (
+            cust.full_name, phone, cust.guests, cust.birth_date
+        ):
+            db.customer = self.upsert_customer(cust)
 
         if services is not None:
             db.services.clear()
-            if services:
-                srv_rows = (
-                    self.s.execute(select(Service).where(Service.name.in_(services)))
-                    .scalars()
-                    .all()
-                )
-                for srv in srv_rows:
-                    db.services.append(BookingService(booking_id=db.id, service_id=srv.id))
+            for service_id in services:
+                db.services.append(BookingService(booking_id=db.id, service_id=service_id))
 
         self.s.flush()
         return _to_domain(db)
+
+
+class AsyncDBRepo:
+    """``DBRepo`` over an ``AsyncSession``.
+
+    Queries and ORM writes are the ``DBRepo`` ones run through ``run_sync``,
+    so they execute on the async driver without blocking the event loop.
+    """
+
+    def __init__(self, session: AsyncSession, post_buffer: timedelta):
+        self.s = session
+        self._sync = DBRepo(session.sync_session, post_buffer)
+        self.touched = self._sync.touched
+        self.chats = self._sync.chats
+        self.enqueued = self._sync.enqueued
+
+    async def get(self, booking_id: int) -> Booking | None:
+        row = (await self.s.execute(_booking_stmt(booking_id))).first()
+        return _row_to_domain(row) if row else None
+
+    async def iter_bookings(self, *, page_size: int = 500, **filters) -> AsyncIterator[Booking]:
+        after = None
+        while True:
+            page = await self.s.run_sync(
+                lambda _: self._sync.bookings_page(after, limit=page_size, **filters)
+            )
+            for booking in page:
+                yield booking
+            if len(page) < page_size:
+                return
+            after = (page[-1].starts_at, page[-1].id)
+
+    async def iter_busy_spans(
+        self, start_dt: datetime, end_dt: datetime, post_buffer: timedelta
+    ) -> AsyncIterator[BusySlot]:
+        result = await self.s.stream(_busy_spans_stmt(start_dt, end_dt, post_buffer))
+        async for row in result:
+            yield _to_busy(row, start_dt, end_dt, post_buffer)
+
+    async def busy_spans(
+        self, start_dt: datetime, end_dt: datetime, post_buffer: timedelta
+    ) -> list[BusySlot]:
+        return await self.s.run_sync(
+            lambda _: self._sync.busy_spans(start_dt, end_dt, post_buffer)
+        )
+
+    async def resources(self) -> list[tuple[int, str]]:
+        return await self.s.run_sync(lambda _: self._sync.resources())
+
+    async def services(self, include_inactive: bool = False) -> list[tuple[int, str, bool, bool]]:
+        return await self.s.run_sync(lambda _: self._sync.services(include_inactive))
+
+    async def conflicts(self, start_dt, end_dt, resource_id: int | None = None) -> list[Booking]:
+        result = await self.s.execute(_conflicts_stmt(start_dt, end_dt, resource_id))
+        return [_row_to_domain(row) for row in result]
+
+    async def has_conflict(self, start_dt, end_dt, resource_id: int | None = None) -> bool:
+        return await self.s.scalar(_has_conflict_stmt(start_dt, end_dt, resource_id))
+
+    async def pending_holds(self) -> list[tuple[datetime, int]]:
+        return await self.s.run_sync(lambda _: self._sync.pending_holds())
+
+    async def mark_expired_if_held_and_due(self, now: datetime) -> list[int]:
+        return await self.s.run_sync(lambda _: self._sync.mark_expired_if_held_and_due(now))
+
+    async def enqueue_job(self, kind: str, payload: dict, run_at: datetime) -> int:
+        return await self.s.run_sync(lambda _: self._sync.enqueue_job(kind, payload, run_at))
+
+    async def claim_jobs(self, now: datetime, limit: int, lock_for: timedelta) -> list[Job]:
+        return await self.s.run_sync(lambda _: self._sync.claim_jobs(now, limit, lock_for))
+
+    async def finish_jobs(self, job_ids: list[int]) -> None:
+        await self.s.run_sync(lambda _: self._sync.finish_jobs(job_ids))
+
+    async def extend_jobs(self, job_ids: list[int], run_at: datetime) -> None:
+        await self.s.run_sync(lambda _: self._sync.extend_jobs(job_ids, run_at))
+
+    async def retry_job(self, job_id: int, run_at: datetime) -> None:
+        await self.s.run_sync(lambda _: self._sync.retry_job(job_id, run_at))
+
+    async def next_job_at(self) -> datetime | None:
+        return await self.s.run_sync(lambda _: self._sync.next_job_at())
+
+    async def upsert_customer(self, customer: Customer) -> DBCustomer:
+        return await self.s.run_sync(lambda _: self._sync.upsert_customer(customer))
+
+    async def add(self, booking: Booking, services: list[int] | None = None) -> Booking:
+        return await self.s.run_sync(lambda _: self._sync.add(booking, services))
+
+    async def create_hold(
+        self, booking: Booking, services: list[int] | None = None
+    ) -> Booking | None:
+        return await self.s.run_sync(lambda _: self._sync.create_hold(booking, services))
+
+    async def update(self, booking: Booking, services: list[int] | None = None) -> Booking:
+        return await self.s.run_sync(lambda _: self._sync.update(booking, services))
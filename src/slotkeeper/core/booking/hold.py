@@ -1,34 +1,127 @@
 from __future__ import annotations
 import asyncio
-from contextlib import suppress
+import heapq
+import logging
+from collections.abc import Callable
+from contextlib import AbstractAsyncContextManager, suppress
 from datetime import datetime
 from zoneinfo import ZoneInfo
 
-from .repo import InMemoryBookingRepo
+from redis.exceptions import RedisError
+
+from slotkeeper.core.lease import RedisLease
 
 
 class HoldManager:
-    def __init__(self, repo: InMemoryBookingRepo, tz: str) -> None:
-        self.repo = repo
+    """Expires holds at their deadlines.
+
+    Upcoming deadlines sit in a min-heap; the runner sleeps until the
+    earliest one (or until ``push`` brings an earlier one), then expires
+    everything due with a single set-based update. The heap is reloaded
+    from the database on start and every ``resync_seconds``.
+
+    With a ``lease`` only the replica holding it sweeps. The leader renews
+    every third of the lease TTL and reloads the heap on each renewal, which
+    is how it learns about holds created by other replicas. If Redis is
+    unreachable every replica sweeps: the update is idempotent, so that only
+    costs duplicated work.
+    """
+
+    def __init__(
+        self,
+        scope: Callable[[], AbstractAsyncContextManager],
+        tz: str,
+        lease: RedisLease | None = None,
+    ) -> None:
+        self.scope = scope
         self.tz = tz
+        self.set_lease(lease)
+        self._heap: list[tuple[datetime, int]] = []
         self._task: asyncio.Task | None = None
         self._stop = asyncio.Event()
+        self._wake = asyncio.Event()
+
+    def set_lease(self, lease: RedisLease | None) -> None:
+        self.lease = lease
+        self.leader = lease is None
 
-    def start(self, interval_seconds: int = 5) -> None:
+    def start(self, resync_seconds: int = 300) -> None:
         if self._task and not self._task.done():
             return
         self._stop.clear()
-        self._task = asyncio.create_task(self._runner(interval_seconds))
+        self._task = asyncio.create_task(self._runner(resync_seconds))
 
-    async def _runner(self, interval_seconds: int) -> None:
+    def push(self, booking_id: int, deadline: datetime) -> None:
+        heapq.heappush(self._heap, (deadline, booking_id))
+        if self._heap[0][1] == booking_id:
+            self._wake.set()
+
+    async def _resync(self) -> None:
+        async with self.scope() as repo:
+            pending = await repo.pending_holds()
+        self._heap = list({*self._heap, *pending})
+        heapq.heapify(self._heap)
+
+    async def _expire_due(self, now: datetime) -> None:
+        async with self.scope() as repo:
+            expired = await repo.mark_expired_if_held_and_due(now)
+        while self._heap and self._heap[0][0] <= now:
+            heapq.heappop(self._heap)
+        if expired:
+            logging.info("holds expired: %s", expired)
+
+    async def _elect(self) -> bool:
+        try:
+            leader = await self.lease.refresh()
+        except RedisError:
+            logging.warning("hold sweeper: lease unavailable, sweeping without it")
+            leader = True
+        if leader != self.leader:
+            logging.info("hold sweeper: %s", "leading" if leader else "standing by")
+        self.leader = leader
+        if not leader:
+            self._heap.clear()
+        return leader
+
+    async def _runner(self, resync_seconds: int) -> None:
         tzinfo = ZoneInfo(self.tz)
+        loop = asyncio.get_running_loop()
+        resync_at = renew_at = loop.time()
         while not self._stop.is_set():
-            now = datetime.now(tzinfo)
-            self.repo.mark_expired_if_held_and_due(now)
+            try:
+                if self.lease is not None and loop.time() >= renew_at:
+                    renew_at = loop.time() + self.lease.ttl_seconds / 3
+                    if await self._elect():
+                        resync_at = loop.time()
+                if self.leader:
+                    if loop.time() >= resync_at:
+                        await self._resync()
+                        resync_at = loop.time() + resync_seconds
+                    now = datetime.now(tzinfo)
+                    if self._heap and self._heap[0][0] <= now:
+                        await self._expire_due(now)
+                        continue
+            except Exception:
+                logging.exception("hold expiry failed")
+                self._heap.clear()
+                resync_at = loop.time() + 5
+
+            timeout = float("inf") if self.lease is None else renew_at - loop.time()
+            if self.leader:
+                timeout = min(timeout, resync_at - loop.time())
+                if self._heap:
+                    wait = (self._heap[0][0] - datetime.now(tzinfo)).total_seconds()
+                    timeout = min(timeout, wait)
+            self._wake.clear()
             with suppress(asyncio.TimeoutError):
-                await asyncio.wait_for(self._stop.wait(), timeout=interval_seconds)
+                await asyncio.wait_for(self._wake.wait(), timeout=max(timeout, 0))
 
     async def stop(self) -> None:
         self._stop.set()
+        self._wake.set()
         if self._task:
             await asyncio.shield(self._task)
+        if self.lease is not None and self.leader:
+            with suppress(RedisError):
+                await self.lease.release()
+            self.leader = False
@@ -1,6 +1,6 @@
 from __future__ import annotations
 from dataclasses import dataclass
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 from enum import StrEnum
 from zoneinfo import ZoneInfo
 
@@ -15,11 +15,19 @@ class BookingStatus(StrEnum):
     no_show = "no_show"
 
 
+# ordered by value so SQL IN lists render the same on every run
+ACTIVE_STATUSES = (BookingStatus.confirmed, BookingStatus.pending_review)
+
+# range queries bound ends_at by this, so longer bookings are refused
+MAX_BOOKING_LENGTH = timedelta(days=1)
+
+
 @dataclass(slots=True, frozen=True)
 class Customer:
     full_name: str
     phone: str
     guests: int
+    birth_date: date | None = None
 
 
 @dataclass(slots=True)
@@ -31,6 +39,7 @@ class Booking:
     status: BookingStatus
     hold_deadline: datetime | None = None
     client_chat_id: int | None = None
+    resource_id: int | None = None
 
     @property
     def is_on_hold(self) -> bool:
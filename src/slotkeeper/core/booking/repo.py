@@ -4,7 +4,7 @@ from collections.abc import Iterable
 from datetime import datetime
 from typing import Dict, List
 
-from .models import Booking, BookingStatus
+from .models import ACTIVE_STATUSES, Booking, BookingStatus
 
 
 class InMemoryBookingRepo:
@@ -41,7 +41,10 @@ class InMemoryBookingRepo:
     def conflicts(self, start: datetime, end: datetime) -> Iterable[Booking]:
         for b in self._items.values():
             if (
-                    b.status in {BookingStatus.confirmed, BookingStatus.pending_review}
+                    b.status in ACTIVE_STATUSES
                     and not (b.ends_at <= start or end <= b.starts_at)
             ):
                 yield b
+
+    def has_conflict(self, start: datetime, end: datetime) -> bool:
+        return next(iter(self.conflicts(start, end)), None) is not None
@@ -1,14 +1,48 @@
 from __future__ import annotations
-from slotkeeper.core.booking.repo import InMemoryBookingRepo
+
+from collections.abc import Awaitable, Callable, Hashable, Iterable
+from contextlib import asynccontextmanager
+from datetime import timedelta
+from typing import TypeVar
+
+from slotkeeper.core.availability_cache import AVAILABILITY_CACHE, SHARED_AVAILABILITY_CACHE
+from slotkeeper.core.booking.db_repo import AsyncDBRepo
 from slotkeeper.core.booking.hold import HoldManager
-from contextlib import contextmanager
-from slotkeeper.db.session import session_scope
-from slotkeeper.core.booking.db_repo import DBRepo
+from slotkeeper.core.jobs import JobDispatcher
+from slotkeeper.db.engine import get_settings
+from slotkeeper.db.session import ROUTER, async_session_scope, run_read
+
+
+@asynccontextmanager
+async def repo_scope(*, read_only: bool = False, keys: Iterable[Hashable] = ()):
+    """``read_only`` scopes may be served by the replica unless one of
+    ``keys`` (chat ids, dates) was written recently; a write scope pins its
+    ``keys`` plus every chat and date it touched. Jobs it enqueued wake
+    ``JOBS`` only after the commit, so outbox messages of a rolled-back
+    transaction never exist."""
+    keys = tuple(keys)
+    async with async_session_scope(read_only=read_only, keys=keys) as s:
+        repo = AsyncDBRepo(s, timedelta(minutes=get_settings().CLEANING_POST_MIN))
+        yield repo
+    days = AVAILABILITY_CACHE.invalidate_spans(repo.touched)
+    if not read_only:
+        ROUTER.pin((*keys, *repo.chats, *days))
+    SHARED_AVAILABILITY_CACHE.invalidate_later(days)
+    if repo.enqueued:
+        JOBS.wake()
+
+T = TypeVar("T")
+
+
+async def read_repo(
+    fn: Callable[[AsyncDBRepo], Awaitable[T]], *, keys: Iterable[Hashable] = ()
+) -> T:
+    """``fn`` on a read-only repo, re-run on the primary if the replica
+    fails partway; ``fn`` must be safe to call twice."""
+    post_buffer = timedelta(minutes=get_settings().CLEANING_POST_MIN)
+    return await run_read(lambda s: fn(AsyncDBRepo(s, post_buffer)), keys=keys)
 
-REPO = InMemoryBookingRepo()
-HOLDS = HoldManager(repo=REPO, tz="Europe/Moscow")
+SHARED_AVAILABILITY_CACHE.on_invalidate = ROUTER.pin
 
-@contextmanager
-def repo_scope():
-    with session_scope() as s:
-        yield DBRepo(s)
\ No newline at end of file
+HOLDS = HoldManager(scope=repo_scope, tz="Europe/Moscow")
+JOBS = JobDispatcher(repo_scope)
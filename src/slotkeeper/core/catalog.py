@@ -0,0 +1,73 @@
+from __future__ import annotations
+import time
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+
+
+class ResourceCatalog:
+    def __init__(self) -> None:
+        self._names: dict[int, str] = {}
+
+    async def load(self, repo) -> None:
+        self._names = dict(await repo.resources())
+
+    def ids(self) -> list[int]:
+        return list(self._names)
+
+    def name(self, resource_id: int | None) -> str:
+        if resource_id is None:
+            return "весь зал"
+        return self._names.get(resource_id, f"#{resource_id}")
+
+
+@dataclass(frozen=True, slots=True)
+class ServiceItem:
+    id: int
+    name: str
+    adult_only: bool
+
+
+class ServiceCatalog:
+    """Active services in display order, reloaded after ``ttl_seconds``."""
+
+    def __init__(self, ttl_seconds: float = 600.0, clock: Callable[[], float] = time.monotonic) -> None:
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._items: dict[int, ServiceItem] = {}
+        self._names: dict[int, str] = {}
+        self._loaded_at: float | None = None
+
+    @property
+    def stale(self) -> bool:
+        return self._loaded_at is None or self._clock() - self._loaded_at > self.ttl_seconds
+
+    async def load(self, repo) -> None:
+        rows = await repo.services(include_inactive=True)
+        self._names = {sid: name for sid, name, _, _ in rows}
+        self._items = {
+            sid: ServiceItem(sid, name, adult_only)
+            for sid, name, adult_only, is_active in rows
+            if is_active
+        }
+        self._loaded_at = self._clock()
+
+    async def ensure_fresh(self, scope) -> None:
+        if self.stale:
+            async with scope() as repo:
+                await self.load(repo)
+
+    def available(self, age: int) -> list[ServiceItem]:
+        return [s for s in self._items.values() if age >= 18 or not s.adult_only]
+
+    def names(self, ids: Iterable[int]) -> list[str]:
+        return [self._names.get(i, f"#{i}") for i in ids]
+
+
+def service_ids(values: Iterable) -> list[int]:
+    """Service ids from FSM data. FSM sessions saved before services were
+    keyed by id hold names; those entries are dropped."""
+    return [v for v in values if isinstance(v, int)]
+
+
+RESOURCES = ResourceCatalog()
+SERVICES = ServiceCatalog()
@@ -0,0 +1,133 @@
+from __future__ import annotations
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable
+from contextlib import AbstractAsyncContextManager, suppress
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+
+
+@dataclass(frozen=True, slots=True)
+class Job:
+    id: int
+    kind: str
+    payload: dict
+    attempts: int
+
+
+Handler = Callable[[dict], Awaitable[None]]
+
+
+class JobDispatcher:
+    """Runs jobs from the durable ``scheduled_jobs`` queue.
+
+    One loop per process claims up to ``batch_size`` due jobs at a time
+    (``FOR UPDATE SKIP LOCKED`` on Postgres, so replicas never claim the
+    same row). Claiming pushes ``run_at`` ``lock_seconds`` ahead and the
+    lease is renewed every third of that while the batch runs, so a slow
+    handler (a Telegram flood wait) keeps its jobs, while a job whose
+    process died comes due again by itself. A job is deleted once its
+    handler returns; a failed job is retried with exponential backoff up
+    to ``max_attempts``.
+    """
+
+    def __init__(
+        self,
+        scope: Callable[[], AbstractAsyncContextManager],
+        *,
+        batch_size: int = 50,
+        poll_seconds: float = 5.0,
+        lock_seconds: float = 60.0,
+        max_attempts: int = 5,
+    ) -> None:
+        self.scope = scope
+        self.batch_size = batch_size
+        self.poll_seconds = poll_seconds
+        self.lock_seconds = lock_seconds
+        self.max_attempts = max_attempts
+        self.handlers: dict[str, Handler] = {}
+        self._task: asyncio.Task | None = None
+        self._stop = asyncio.Event()
+        self._wake = asyncio.Event()
+
+    def register(self, kind: str, handler: Handler) -> None:
+        self.handlers[kind] = handler
+
+    def start(self) -> None:
+        if self._task and not self._task.done():
+            return
+        self._stop.clear()
+        self._task = asyncio.create_task(self._runner())
+
+    def wake(self) -> None:
+        self._wake.set()
+
+    async def _run(self, job: Job) -> int | None:
+        handler = self.handlers.get(job.kind)
+        if handler is None:
+            logging.error("job #%s: no handler for %r, dropped", job.id, job.kind)
+            return job.id
+        try:
+            await handler(job.payload)
+        except Exception:
+            if job.attempts >= self.max_attempts:
+                logging.exception("job #%s %s failed %s times, dropped", job.id, job.kind, job.attempts)
+                return job.id
+            logging.exception("job #%s %s failed, will retry", job.id, job.kind)
+            return None
+        return job.id
+
+    async def _keep_claimed(self, job_ids: list[int]) -> None:
+        lock_for = timedelta(seconds=self.lock_seconds)
+        while True:
+            await asyncio.sleep(self.lock_seconds / 3)
+            try:
+                async with self.scope() as repo:
+                    await repo.extend_jobs(job_ids, datetime.now(timezone.utc) + lock_for)
+            except Exception:
+                logging.exception("jobs %s: lease renewal failed", job_ids)
+
+    async def dispatch_due(self) -> int:
+        now = datetime.now(timezone.utc)
+        async with self.scope() as repo:
+            jobs = await repo.claim_jobs(now, self.batch_size, timedelta(seconds=self.lock_seconds))
+        if not jobs:
+            return 0
+        keeper = asyncio.create_task(self._keep_claimed([job.id for job in jobs]))
+        try:
+            results = await asyncio.gather(*(self._run(job) for job in jobs))
+        finally:
+            keeper.cancel()
+            with suppress(asyncio.CancelledError):
+                await keeper
+        done = [job_id for job_id in results if job_id is not None]
+        failed = [job for job, job_id in zip(jobs, results) if job_id is None]
+        async with self.scope() as repo:
+            await repo.finish_jobs(done)
+            for job in failed:
+                backoff = timedelta(seconds=min(10 * 2 ** job.attempts, 3600))
+                await repo.retry_job(job.id, datetime.now(timezone.utc) + backoff)
+        return len(jobs)
+
+    async def _runner(self) -> None:
+        while not self._stop.is_set():
+            self._wake.clear()
+            timeout = self.poll_seconds
+            try:
+                if await self.dispatch_due() == self.batch_size:
+                    continue
+                async with self.scope() as repo:
+                    next_at = await repo.next_job_at()
+                if next_at is not None:
+                    wait = (next_at - datetime.now(timezone.utc)).total_seconds()
+                    timeout = min(timeout, max(wait, 0))
+            except Exception:
+                logging.exception("job dispatch failed")
+            with suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self._wake.wait(), timeout=timeout)
+
+    async def stop(self) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._task:
+            await asyncio.shield(self._task)
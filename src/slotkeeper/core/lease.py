@@ -0,0 +1,48 @@
+from __future__ import annotations
+import uuid
+
+from redis.asyncio import Redis
+
+_REFRESH = """
+local owner = redis.call('GET', KEYS[1])
+if not owner then
+    redis.call('SET', KEYS[1], ARGV[1], 'PX', ARGV[2])
+    return 1
+end
+if owner == ARGV[1] then
+    redis.call('PEXPIRE', KEYS[1], ARGV[2])
+    return 1
+end
+return 0
+"""
+
+_RELEASE = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+class RedisLease:
+    """Leadership as a Redis key holding this process's token with a TTL.
+
+    ``refresh`` takes the key when it is free and extends it when we
+    already own it; a holder that dies stops refreshing and the key
+    expires, so another process takes over within ``ttl_seconds``.
+    """
+
+    def __init__(self, redis: Redis, key: str, ttl_seconds: float = 15.0) -> None:
+        self.redis = redis
+        self.key = key
+        self.ttl_seconds = ttl_seconds
+        self.token = uuid.uuid4().hex
+
+    async def refresh(self) -> bool:
+        held = await self.redis.eval(
+            _REFRESH, 1, self.key, self.token, int(self.ttl_seconds * 1000)
+        )
+        return bool(held)
+
+    async def release(self) -> None:
+        await self.redis.eval(_RELEASE, 1, self.key, self.token)
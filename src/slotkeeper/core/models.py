@@ -13,8 +13,13 @@ class TimeSlot:
         return self.end - self.start
 
 
+@dataclass(frozen=True, slots=True)
+class BusySlot(TimeSlot):
+    resource_id: int | None = None
+
+
 def overlaps(a: TimeSlot, b: TimeSlot) -> bool:
-    return not (a.end <= b.start and b.end <= a.start)
+    return a.start < b.end and b.start < a.end
 
 
 def with_buffers(slot: TimeSlot, pre: timedelta, post: timedelta) -> TimeSlot:
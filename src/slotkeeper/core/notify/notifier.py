@@ -1,75 +1,84 @@
 from __future__ import annotations
 
-import asyncio
-from contextlib import suppress
-from dataclasses import dataclass
-from datetime import datetime, timedelta
-from typing import Optional
+import logging
+from collections.abc import Iterable
+from datetime import datetime, timedelta, timezone
+from typing import Any, Optional
 from zoneinfo import ZoneInfo
 
-from aiogram import Bot
+from aiogram.exceptions import TelegramBadRequest, TelegramForbiddenError
+from aiogram.types import InlineKeyboardMarkup
 
 from slotkeeper.config import Settings
-from slotkeeper.core.booking.shared import REPO
+from slotkeeper.core.booking.models import Booking, BookingStatus
+from slotkeeper.core.booking.shared import repo_scope
+from slotkeeper.core.notify.outbound import OUTBOUND
 
 
-@dataclass
-class _Runtime:
-    bot: Optional[Bot] = None
-    settings: Optional[Settings] = None
+HOLD_WARNING = "hold_warning"
+SEND_MESSAGE = "send_message"
 
 
 class Notifier:
     def __init__(self) -> None:
-        self.bot: Optional[Bot] = None
         self.settings: Optional[Settings] = None
-        self._tasks: set[asyncio.Task] = set()
 
-    def set_runtime(self, bot: Bot, settings: Settings) -> None:
-        self.bot = bot
+    def set_runtime(self, settings: Settings) -> None:
         self.settings = settings
 
-    def schedule_hold_warning(self, booking_id: int) -> None:
-        if not self.bot or not self.settings:
+    async def schedule_hold_warning(self, repo, booking: Booking) -> None:
+        """Queue the admin warning in ``repo``'s transaction, so it is stored
+        exactly when the hold is."""
+        if not self.settings or not booking.hold_deadline:
             return
-        task = asyncio.create_task(self._hold_warning_runner(booking_id))
-        self._tasks.add(task)
-        task.add_done_callback(self._tasks.discard)
+        warn_before = timedelta(minutes=max(0, self.settings.HOLD_WARN_BEFORE_MIN))
+        await repo.enqueue_job(
+            HOLD_WARNING, {"booking_id": booking.id}, booking.hold_deadline - warn_before
+        )
 
-    async def _hold_warning_runner(self, booking_id: int) -> None:
-        bot = self.bot
+    async def queue_messages(
+        self,
+        repo,
+        chat_ids: Iterable[int],
+        text: str,
+        *,
+        reply_markup: InlineKeyboardMarkup | None = None,
+        **kwargs: Any,
+    ) -> None:
+        """Write messages to the outbox in ``repo``'s transaction; the
+        ``send_message`` job delivers them once it commits."""
+        if reply_markup is not None:
+            kwargs["reply_markup"] = reply_markup.model_dump(mode="json", exclude_none=True)
+        now = datetime.now(timezone.utc)
+        for chat_id in chat_ids:
+            await repo.enqueue_job(SEND_MESSAGE, {"chat_id": chat_id, "text": text, **kwargs}, now)
+
+    async def send_message(self, payload: dict) -> None:
+        kwargs = dict(payload)
+        chat_id, text = kwargs.pop("chat_id"), kwargs.pop("text")
+        if "reply_markup" in kwargs:
+            kwargs["reply_markup"] = InlineKeyboardMarkup.model_validate(kwargs["reply_markup"])
+        try:
+            await OUTBOUND.deliver(chat_id, text, **kwargs)
+        except (TelegramBadRequest, TelegramForbiddenError) as exc:
+            logging.warning("outbox: message to %s dropped: %s", chat_id, exc)
+
+    async def send_hold_warning(self, payload: dict) -> None:
         settings = self.settings
-        if not bot or not settings:
-            return
-
-        b = REPO.get(booking_id)
-        if not b or not b.hold_deadline:
+        if not settings:
             return
 
         tz = ZoneInfo(settings.APP_TIMEZONE)
-        warn_before = timedelta(minutes=max(0, settings.HOLD_WARN_BEFORE_MIN))
-        now = datetime.now(tz)
-        fire_at = b.hold_deadline - warn_before
-        delay = (fire_at - now).total_seconds()
-
-        if delay > 0:
-            try:
-                await asyncio.sleep(delay)
-            except asyncio.CancelledError:
+        async with repo_scope() as repo:
+            b = await repo.get(payload["booking_id"])
+            if not b or b.status != BookingStatus.pending_review or not b.hold_deadline:
                 return
-
-        b2 = REPO.get(booking_id)
-        if not b2 or b2.status != "pending_review" or not b2.hold_deadline:
-            return
-
-        text = (
-            f"⏳ Холд заявки #{b2.id} истекает в {b2.hold_deadline.astimezone(tz).strftime('%H:%M')}.\n"
-            f"{b2.customer.fullname}, гостей: {b2.customer.guests}, тел: {b2.customer.phone}\n"
-            f"{b2.starts_at.strftime('%Y-%m-%d %H:%M')}–{b2.ends_at.strftime('%H:%M')}"
-        )
-        for admin_id in settings.admin_ids:
-            with suppress(asyncio.TimeoutError):
-                await bot.send_message(chat_id=admin_id, text=text)
+            text = (
+                f"⏳ Холд заявки #{b.id} истекает в {b.hold_deadline.astimezone(tz).strftime('%H:%M')}.\n"
+                f"{b.customer.full_name}, гостей: {b.customer.guests}, тел: {b.customer.phone}\n"
+                f"{b.starts_at.strftime('%Y-%m-%d %H:%M')}–{b.ends_at.strftime('%H:%M')}"
+            )
+            await self.queue_messages(repo, settings.admin_ids, text)
 
 
 NOTIFY = Notifier()
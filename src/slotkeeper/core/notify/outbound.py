@@ -0,0 +1,225 @@
+from __future__ import annotations
+import asyncio
+import logging
+import time
+from collections import deque
+from collections.abc import Callable
+from contextlib import suppress
+from dataclasses import dataclass, field, replace
+from typing import Any, Optional
+
+from aiogram import Bot
+from aiogram.exceptions import TelegramAPIError, TelegramNetworkError, TelegramRetryAfter
+
+
+class TokenBucket:
+    """``rate`` tokens per second, at most ``capacity`` banked."""
+
+    def __init__(
+        self, rate: float, capacity: float, clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self._clock = clock
+        self._tokens = capacity
+        self._stamp = clock()
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._stamp) * self.rate)
+        self._stamp = now
+
+    @property
+    def full(self) -> bool:
+        self._refill()
+        return self._tokens >= self.capacity
+
+    def take(self) -> float:
+        """Take a token; returns 0, or the seconds to wait before one exists."""
+        self._refill()
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return 0.0
+        return (1 - self._tokens) / self.rate
+
+    async def acquire(self) -> None:
+        while (wait := self.take()) > 0:
+            await asyncio.sleep(wait)
+
+
+@dataclass(frozen=True, slots=True)
+class OutboundMessage:
+    chat_id: int
+    text: str
+    kwargs: dict[str, Any] = field(default_factory=dict)
+    flood_waits: int = 0
+
+
+class _Chat:
+    __slots__ = ("bucket", "lock", "blocked_until", "backlog", "flush")
+
+    def __init__(self, rate: float, burst: float) -> None:
+        self.bucket = TokenBucket(rate, burst)
+        self.lock = asyncio.Lock()
+        self.blocked_until = 0.0
+        self.backlog: deque[OutboundMessage] = deque()
+        self.flush: asyncio.TimerHandle | None = None
+
+    def idle(self, now: float) -> bool:
+        return (
+            not self.lock.locked() and not self.backlog and now >= self.blocked_until
+            and self.bucket.full
+        )
+
+
+class MessageDispatcher:
+    """Outbound Telegram messages, sent by a bounded pool of workers.
+
+    ``send`` only enqueues. Workers share a global token bucket and keep one
+    per chat, matching Telegram's ~30 msg/s overall and ~1 msg/s per chat;
+    messages to one chat go out in order, different chats in parallel.
+    A chat hit by ``TelegramRetryAfter`` is parked: its messages wait in a
+    per-chat backlog, holding neither a worker nor the chat lock, and go
+    back on the queue in order once the wait is over. Network errors are
+    retried with backoff; other API errors (blocked bot, bad chat) drop
+    the message.
+    """
+
+    def __init__(
+        self,
+        workers: int = 8,
+        global_rate: float = 25.0,
+        chat_rate: float = 1.0,
+        chat_burst: float = 3.0,
+        max_attempts: int = 5,
+    ) -> None:
+        self.bot: Optional[Bot] = None
+        self.workers = workers
+        self.chat_rate = chat_rate
+        self.chat_burst = chat_burst
+        self.max_attempts = max_attempts
+        self._global = TokenBucket(global_rate, global_rate)
+        self._chats: dict[int, _Chat] = {}
+        self._queue: asyncio.Queue[OutboundMessage] = asyncio.Queue()
+        self._deferred = 0
+        self._tasks: list[asyncio.Task] = []
+
+    def set_runtime(self, bot: Bot) -> None:
+        self.bot = bot
+
+    def send(self, chat_id: int, text: str, **kwargs: Any) -> None:
+        self._queue.put_nowait(OutboundMessage(chat_id, text, kwargs))
+
+    def send_many(self, chat_ids: list[int], text: str, **kwargs: Any) -> None:
+        for chat_id in chat_ids:
+            self.send(chat_id, text, **kwargs)
+
+    async def deliver(self, chat_id: int, text: str, **kwargs: Any) -> None:
+        """Send now under the same limits; failures raise instead of being
+        logged, so a durable caller can retry."""
+        if self.bot is None:
+            raise RuntimeError("outbound: bot is not set")
+        loop = asyncio.get_running_loop()
+        chat = self._chat(chat_id)
+        msg = OutboundMessage(chat_id, text, kwargs)
+        for _ in range(self.max_attempts):
+            wait = chat.blocked_until - loop.time()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            if await self._send_once(chat, msg) is None:
+                return
+        raise RuntimeError(f"outbound: chat {chat_id} still flood-limited")
+
+    def start(self) -> None:
+        if self._tasks:
+            return
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def _drain(self) -> None:
+        await self._queue.join()
+        while self._deferred:
+            await asyncio.sleep(0.05)
+            await self._queue.join()
+
+    async def stop(self, drain_seconds: float = 5.0) -> None:
+        with suppress(asyncio.TimeoutError):
+            await asyncio.wait_for(self._drain(), timeout=drain_seconds)
+        for chat in self._chats.values():
+            if chat.flush is not None:
+                chat.flush.cancel()
+                chat.flush = None
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def _chat(self, chat_id: int) -> _Chat:
+        chat = self._chats.get(chat_id)
+        if chat is None:
+            if len(self._chats) > 1024:
+                now = asyncio.get_running_loop().time()
+                self._chats = {k: c for k, c in self._chats.items() if not c.idle(now)}
+            chat = self._chats[chat_id] = _Chat(self.chat_rate, self.chat_burst)
+        return chat
+
+    async def _send_once(self, chat: _Chat, msg: OutboundMessage) -> float | None:
+        """Send under the chat lock; ``None`` when sent, else the flood wait
+        in seconds (the chat is then blocked until it has passed)."""
+        async with chat.lock:
+            for attempt in range(1, self.max_attempts + 1):
+                await chat.bucket.acquire()
+                await self._global.acquire()
+                try:
+                    await self.bot.send_message(msg.chat_id, msg.text, **msg.kwargs)
+                    return None
+                except TelegramRetryAfter as exc:
+                    logging.warning("outbound: chat %s flood wait %ss", msg.chat_id, exc.retry_after)
+                    chat.blocked_until = asyncio.get_running_loop().time() + exc.retry_after
+                    return float(exc.retry_after)
+                except (TelegramNetworkError, asyncio.TimeoutError):
+                    if attempt == self.max_attempts:
+                        raise
+                    await asyncio.sleep(2 ** attempt)
+        return None
+
+    def _defer(self, chat: _Chat, msg: OutboundMessage, *, first: bool = False) -> None:
+        if msg.flood_waits > self.max_attempts:
+            logging.error("outbound: chat %s gave up after %s flood waits", msg.chat_id, self.max_attempts)
+            return
+        if first:
+            chat.backlog.appendleft(msg)
+        else:
+            chat.backlog.append(msg)
+        self._deferred += 1
+        if chat.flush is None:
+            loop = asyncio.get_running_loop()
+            chat.flush = loop.call_later(max(chat.blocked_until - loop.time(), 0), self._flush, chat)
+
+    def _flush(self, chat: _Chat) -> None:
+        chat.flush = None
+        while chat.backlog:
+            self._queue.put_nowait(chat.backlog.popleft())
+            self._deferred -= 1
+
+    async def _worker(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            msg = await self._queue.get()
+            try:
+                if self.bot is None:
+                    logging.error("outbound: no bot, message to %s dropped", msg.chat_id)
+                    continue
+                chat = self._chat(msg.chat_id)
+                if chat.backlog or loop.time() < chat.blocked_until:
+                    self._defer(chat, msg)
+                elif await self._send_once(chat, msg) is not None:
+                    self._defer(chat, replace(msg, flood_waits=msg.flood_waits + 1), first=True)
+            except TelegramAPIError as exc:
+                logging.warning("outbound: message to %s dropped: %s", msg.chat_id, exc)
+            except Exception:
+                logging.exception("outbound: message to %s failed", msg.chat_id)
+            finally:
+                self._queue.task_done()
+
+
+OUTBOUND = MessageDispatcher()
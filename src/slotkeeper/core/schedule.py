@@ -0,0 +1,209 @@
+from __future__ import annotations
+from calendar import monthrange
+from contextlib import aclosing
+from dataclasses import replace
+from datetime import date, datetime, timedelta
+from zoneinfo import ZoneInfo
+
+from slotkeeper.config import Settings
+from slotkeeper.core.availability import ResourceIndex, free_starts_batch_any
+from slotkeeper.core.availability_cache import AVAILABILITY_CACHE, SHARED_AVAILABILITY_CACHE
+from slotkeeper.core.booking.models import MAX_BOOKING_LENGTH
+from slotkeeper.core.booking.shared import read_repo
+from slotkeeper.core.catalog import RESOURCES
+from slotkeeper.core.models import TimeSlot
+
+DISPLAY_START_HOUR = 9
+DISPLAY_END_HOUR = 22
+
+
+def day_window(day: date, tz_name: str) -> TimeSlot:
+    start = datetime.combine(day, datetime.min.time()).replace(tzinfo=ZoneInfo(tz_name))
+    return TimeSlot(start=start, end=start + timedelta(days=1))
+
+
+def local_dates(span: TimeSlot, tz_name: str) -> list[date]:
+    tz = ZoneInfo(tz_name)
+    first = span.start.astimezone(tz).date()
+    last = (span.end - timedelta(microseconds=1)).astimezone(tz).date()
+    return [first + timedelta(days=i) for i in range((last - first).days + 1)]
+
+
+async def busy_for_days(days: list[date], settings: Settings) -> dict[date, tuple[TimeSlot, ...]]:
+    out: dict[date, tuple[TimeSlot, ...]] = {}
+    missing: list[date] = []
+    for day in days:
+        cached = AVAILABILITY_CACHE.get(day)
+        if cached is None:
+            missing.append(day)
+        else:
+            out[day] = cached
+    if not missing:
+        return out
+
+    versions = {day: AVAILABILITY_CACHE.version(day) for day in missing}
+    if SHARED_AVAILABILITY_CACHE.enabled:
+        shared = await SHARED_AVAILABILITY_CACHE.get_many(missing, settings.APP_TIMEZONE)
+        for day, busy in shared.items():
+            AVAILABILITY_CACHE.put(day, versions[day], busy)
+            out[day] = busy
+        missing = [day for day in missing if day not in shared]
+        if not missing:
+            return out
+    shared_versions = await SHARED_AVAILABILITY_CACHE.versions(missing)
+
+    windows = {day: day_window(day, settings.APP_TIMEZONE) for day in missing}
+    post_buf = timedelta(minutes=settings.CLEANING_POST_MIN)
+    spans = await read_repo(
+        lambda repo: repo.busy_spans(windows[min(missing)].start, windows[max(missing)].end, post_buf),
+        keys=missing,
+    )
+
+    per_day: dict[date, list[TimeSlot]] = {day: [] for day in missing}
+    for span in spans:
+        for day in local_dates(span, settings.APP_TIMEZONE):
+            window = windows.get(day)
+            if window is not None:
+                per_day[day].append(
+                    replace(span, start=max(span.start, window.start), end=min(span.end, window.end))
+                )
+    for day, busy in per_day.items():
+        AVAILABILITY_CACHE.put(day, versions[day], busy)
+        out[day] = tuple(busy)
+    await SHARED_AVAILABILITY_CACHE.put_many(
+        {day: (shared_versions[day], out[day]) for day in shared_versions},
+        settings.APP_TIMEZONE,
+    )
+    return out
+
+
+def duration_presets(settings: Settings) -> list[int]:
+    hours = [int(x) for x in settings.SLOT_PRESETS_HOURS.split(",") if x.strip()]
+    return [h for h in hours if timedelta(hours=h) <= MAX_BOOKING_LENGTH]
+
+
+async def _index_between(span: TimeSlot, settings: Settings) -> ResourceIndex:
+    days = local_dates(span, settings.APP_TIMEZONE)
+    busy = [b for spans in (await busy_for_days(days, settings)).values() for b in spans]
+    return ResourceIndex(busy, RESOURCES.ids())
+
+
+async def free_resources(start: datetime, end: datetime, settings: Settings) -> list[int | None]:
+    post_buf = timedelta(minutes=settings.CLEANING_POST_MIN)
+    index = await _index_between(TimeSlot(start=start, end=end + post_buf), settings)
+    return index.free_resources(start, end, post_buffer=post_buf)
+
+
+async def day_free_gaps(day: date, settings: Settings) -> list[tuple[datetime, timedelta]]:
+    window = day_window(day, settings.APP_TIMEZONE)
+    post_buf = timedelta(minutes=settings.CLEANING_POST_MIN)
+    horizon = window.end + timedelta(hours=max(duration_presets(settings), default=0))
+    index = await _index_between(TimeSlot(window.start, horizon + post_buf), settings)
+
+    gaps = index.free_gaps(
+        window,
+        duration=timedelta(minutes=settings.SLOT_DEFAULT_MIN),
+        step=timedelta(minutes=settings.SLOT_STEP_MIN),
+        post_buffer=post_buf,
+        horizon=horizon,
+    )
+    return [(t, gap) for t, gap in gaps if DISPLAY_START_HOUR <= t.hour < DISPLAY_END_HOUR]
+
+
+async def start_gap(start: datetime, settings: Settings) -> timedelta:
+    post_buf = timedelta(minutes=settings.CLEANING_POST_MIN)
+    horizon = start + timedelta(hours=max(duration_presets(settings), default=0))
+    index = await _index_between(TimeSlot(start, horizon + post_buf), settings)
+
+    gaps = index.free_gaps(
+        TimeSlot(start, start),
+        duration=timedelta(0),
+        step=timedelta(minutes=1),
+        post_buffer=post_buf,
+        horizon=horizon,
+    )
+    return gaps[0][1] if gaps else timedelta(0)
+
+
+async def nearest_free_starts(
+    after: datetime, settings: Settings, *, limit: int, max_days: int
+) -> list[datetime]:
+    tz = ZoneInfo(settings.APP_TIMEZONE)
+    first = after.astimezone(tz).date()
+    _, horizon_day = booking_horizon(datetime.now(tz).date(), settings.MAX_MONTHS_AHEAD)
+    last = min(first + timedelta(days=max_days - 1), horizon_day)
+    if first > last or limit <= 0:
+        return []
+
+    duration = timedelta(minutes=settings.SLOT_DEFAULT_MIN)
+    step = timedelta(minutes=settings.SLOT_STEP_MIN)
+    post_buf = timedelta(minutes=settings.CLEANING_POST_MIN)
+    range_start = day_window(first, settings.APP_TIMEZONE).start
+    range_end = day_window(last, settings.APP_TIMEZONE).end + post_buf
+
+    resources = RESOURCES.ids()
+    days = [first + timedelta(days=i) for i in range((last - first).days + 1)]
+
+    async def scan(repo) -> list[datetime]:
+        found: list[datetime] = []
+        async with aclosing(repo.iter_busy_spans(range_start, range_end, post_buf)) as stream:
+            pending = await anext(stream, None)
+            active: list[TimeSlot] = []
+            day = first
+            while day <= last:
+                window = day_window(day, settings.APP_TIMEZONE)
+                while pending is not None and pending.start < window.end + post_buf:
+                    active.append(pending)
+                    pending = await anext(stream, None)
+                active = [b for b in active if b.end > window.start]
+
+                index = ResourceIndex(active, resources)
+                for t in index.free_starts(
+                    window, duration=duration, step=step, post_buffer=post_buf
+                ):
+                    if t >= after and DISPLAY_START_HOUR <= t.hour < DISPLAY_END_HOUR:
+                        found.append(t)
+                        if len(found) == limit:
+                            return found
+                day += timedelta(days=1)
+        return found
+
+    return await read_repo(scan, keys=days)
+
+
+async def month_free_counts(
+    year: int, month: int, settings: Settings, min_date: date, max_date: date
+) -> dict[date, int]:
+    first = max(date(year, month, 1), min_date)
+    last = min(date(year, month, monthrange(year, month)[1]), max_date)
+    if first > last:
+        return {}
+
+    days = [first + timedelta(days=i) for i in range((last - first).days + 1)]
+    duration = timedelta(minutes=settings.SLOT_DEFAULT_MIN)
+    step = timedelta(minutes=settings.SLOT_STEP_MIN)
+    post_buf = timedelta(minutes=settings.CLEANING_POST_MIN)
+    span = TimeSlot(
+        day_window(first, settings.APP_TIMEZONE).start,
+        day_window(last, settings.APP_TIMEZONE).end + post_buf,
+    )
+    index = await _index_between(span, settings)
+
+    batch = free_starts_batch_any(
+        days,
+        index,
+        tz_name=settings.APP_TIMEZONE,
+        durations=[duration],
+        step=step,
+        post_buffer=post_buf,
+    )
+    hours = batch.hours()
+    visible = (hours >= DISPLAY_START_HOUR) & (hours < DISPLAY_END_HOUR)
+    counts = (batch.mask[0] & visible).sum(axis=1)
+    return {d: int(n) for d, n in zip(days, counts)}
+
+
+def booking_horizon(today: date, months_ahead: int) -> tuple[date, date]:
+    total_months = today.year * 12 + (today.month - 1) + months_ahead
+    max_day = date(total_months // 12, total_months % 12 + 1, 1) - timedelta(days=1)
+    return today, max_day
@@ -1,14 +1,98 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from __future__ import annotations
+from sqlalchemy import Engine, create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+
 from slotkeeper.config import Settings
 
-_engine = None
-_Session = None
+_ASYNC_DRIVERS = {"postgresql": "postgresql+asyncpg", "sqlite": "sqlite+aiosqlite"}
+_CONNECT_TIMEOUT_ARG = {"asyncpg": "timeout", "psycopg": "connect_timeout", "psycopg2": "connect_timeout"}
+
+_settings: Settings | None = None
+_async_engines: dict[str, AsyncEngine] = {}
+_async_sessions: dict[str, async_sessionmaker[AsyncSession]] = {}
+_sync_engine: Engine | None = None
+_sync_sessions: sessionmaker[Session] | None = None
+
+
+def configure(settings: Settings) -> None:
+    global _settings
+    _settings = settings
+
+
+def get_settings() -> Settings:
+    global _settings
+    if _settings is None:
+        _settings = Settings()
+    return _settings
+
+
+def async_url(url: str) -> str:
+    parsed = make_url(url)
+    if parsed.get_driver_name() in ("asyncpg", "aiosqlite"):
+        return url
+    driver = _ASYNC_DRIVERS.get(parsed.get_backend_name(), parsed.drivername)
+    return parsed.set(drivername=driver).render_as_string(hide_password=False)
+
+
+def _url(role: str) -> str:
+    s = get_settings()
+    url = {"primary": s.DATABASE_URL, "replica": s.DATABASE_REPLICA_URL}[role]
+    if not url:
+        raise RuntimeError(f"no database URL configured for {role}")
+    return url
+
+
+def _pool_kwargs(url: str) -> dict:
+    parsed = make_url(url)
+    if parsed.get_backend_name() == "sqlite":
+        return {}
+    s = get_settings()
+    kwargs = {
+        "pool_size": s.DB_POOL_SIZE,
+        "max_overflow": s.DB_MAX_OVERFLOW,
+        "pool_recycle": s.DB_POOL_RECYCLE_SEC,
+        "pool_timeout": s.DB_POOL_TIMEOUT_SEC,
+    }
+    arg = _CONNECT_TIMEOUT_ARG.get(parsed.get_driver_name())
+    if arg:
+        kwargs["connect_args"] = {arg: s.DB_CONNECT_TIMEOUT_SEC}
+    return kwargs
+
+
+def async_engine(role: str = "primary") -> AsyncEngine:
+    """The process-wide async engine for ``role`` (``primary`` or
+    ``replica``), created with its pool on first use."""
+    if role not in _async_engines:
+        url = async_url(_url(role))
+        eng = create_async_engine(url, pool_pre_ping=True, **_pool_kwargs(url))
+        _async_engines[role] = eng
+        _async_sessions[role] = async_sessionmaker(eng, autoflush=False, expire_on_commit=False)
+    return _async_engines[role]
+
+
+def async_sessions(role: str = "primary") -> async_sessionmaker[AsyncSession]:
+    async_engine(role)
+    return _async_sessions[role]
+
+
+def sync_sessions() -> sessionmaker[Session]:
+    """Blocking sessions for scripts; the bot itself never opens this pool."""
+    global _sync_engine, _sync_sessions
+    if _sync_sessions is None:
+        url = _url("primary")
+        _sync_engine = create_engine(url, pool_pre_ping=True, **_pool_kwargs(url))
+        _sync_sessions = sessionmaker(bind=_sync_engine, autoflush=False, autocommit=False)
+    return _sync_sessions
+
 
-def get_session():
-    global _engine, _Session
-    if _engine is None:
-        url = Settings().DATABASE_URL
-        _engine = create_engine(url, pool_pre_ping=True, future=True)
-        _Session = sessionmaker(bind=_engine, expire_on_commit=False, future=True)
-    return _Session()
\ No newline at end of file
+async def dispose() -> None:
+    global _sync_engine, _sync_sessions
+    for eng in _async_engines.values():
+        await eng.dispose()
+    _async_engines.clear()
+    _async_sessions.clear()
+    if _sync_engine is not None:
+        _sync_engine.dispose()
+    _sync_engine = _sync_sessions = None
@@ -0,0 +1,39 @@
+"""add resources
+
+Revision ID: 31f18a63b93f
+Revises: d0670a83bbdd
+Create Date: 2026-10-18 12:04:51.218337
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '31f18a63b93f'
+down_revision: Union[str, Sequence[str], None] = 'd0670a83bbdd'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('resources',
+    sa.Column('id', sa.BigInteger(), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('is_active', sa.Boolean(), nullable=False),
+    sa.Column('sort_order', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('name')
+    )
+    op.add_column('bookings', sa.Column('resource_id', sa.BigInteger(), nullable=True))
+    op.create_foreign_key('bookings_resource_id_fkey', 'bookings', 'resources', ['resource_id'], ['id'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('bookings_resource_id_fkey', 'bookings', type_='foreignkey')
+    op.drop_column('bookings', 'resource_id')
+    op.drop_table('resources')
@@ -0,0 +1,49 @@
+"""booking hot path indexes
+
+Revision ID: 4b8d1f6e2a93
+Revises: 7c2e9a41d5b0
+Create Date: 2026-10-18 19:48:37.120554
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4b8d1f6e2a93'
+down_revision: Union[str, Sequence[str], None] = '7c2e9a41d5b0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = [
+    ('ix_bookings_status_ends_starts', 'bookings', ['status', 'ends_at', 'starts_at'], None),
+    ('ix_bookings_ends_starts', 'bookings', ['ends_at', 'starts_at'], None),
+    ('ix_bookings_hold_deadline_pending', 'bookings', ['hold_deadline'], "status = 'pending_review'"),
+    ('ix_bookings_client_chat_id', 'bookings', ['client_chat_id'], "client_chat_id IS NOT NULL"),
+    ('ix_bookings_customer_id', 'bookings', ['customer_id'], None),
+    ('ix_customers_phone', 'customers', ['phone'], None),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        for name, table, columns, where in INDEXES:
+            op.create_index(
+                name,
+                table,
+                columns,
+                postgresql_concurrently=True,
+                postgresql_where=sa.text(where) if where else None,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
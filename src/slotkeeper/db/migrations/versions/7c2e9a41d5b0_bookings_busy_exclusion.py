@@ -0,0 +1,77 @@
+"""bookings busy_until + exclusion constraints
+
+Revision ID: 7c2e9a41d5b0
+Revises: 31f18a63b93f
+Create Date: 2026-10-18 19:20:11.402913
+
+"""
+import logging
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c2e9a41d5b0'
+down_revision: Union[str, Sequence[str], None] = '31f18a63b93f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+ACTIVE_SQL = "status IN ('pending_review', 'confirmed')"
+
+# CLEANING_POST_MIN when this revision was written; override with
+# `alembic -x post_buffer_min=N upgrade ...`
+POST_BUFFER_MIN = 60
+
+# An active row loses to an overlapping active row on the same resource
+# (or both venue-wide) that is confirmed while it is not, or has the same
+# status and a lower id. Losers are expired so the constraints can be built.
+EXPIRE_OVERLAPS = """
+    UPDATE bookings AS b SET status = 'expired'
+    WHERE b.status IN ('pending_review', 'confirmed') AND EXISTS (
+        SELECT 1 FROM bookings AS o
+        WHERE o.status IN ('pending_review', 'confirmed')
+          AND o.resource_id IS NOT DISTINCT FROM b.resource_id
+          AND tstzrange(o.starts_at, o.busy_until) && tstzrange(b.starts_at, b.busy_until)
+          AND (o.status <> 'confirmed', o.id) < (b.status <> 'confirmed', b.id)
+    )
+"""
+
+log = logging.getLogger("alembic.runtime.migration")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    x_args = context.get_x_argument(as_dictionary=True)
+    post_buffer_min = int(x_args.get("post_buffer_min", POST_BUFFER_MIN))
+    op.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+    op.add_column('bookings', sa.Column('busy_until', sa.DateTime(timezone=True), nullable=True))
+    op.execute(
+        sa.text("UPDATE bookings SET busy_until = ends_at + make_interval(mins => :m)")
+        .bindparams(m=post_buffer_min)
+    )
+    op.alter_column('bookings', 'busy_until', nullable=False)
+    if context.is_offline_mode():
+        op.execute(EXPIRE_OVERLAPS)
+    else:
+        expired = op.get_bind().execute(sa.text(EXPIRE_OVERLAPS + "RETURNING b.id")).scalars().all()
+        if expired:
+            log.warning("expired %d overlapping bookings: %s", len(expired), sorted(expired))
+    op.execute(
+        "ALTER TABLE bookings ADD CONSTRAINT ex_bookings_resource_busy "
+        "EXCLUDE USING gist (resource_id WITH =, tstzrange(starts_at, busy_until) WITH &&) "
+        f"WHERE ({ACTIVE_SQL} AND resource_id IS NOT NULL)"
+    )
+    op.execute(
+        "ALTER TABLE bookings ADD CONSTRAINT ex_bookings_venue_busy "
+        "EXCLUDE USING gist (tstzrange(starts_at, busy_until) WITH &&) "
+        f"WHERE ({ACTIVE_SQL} AND resource_id IS NULL)"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('ex_bookings_venue_busy', 'bookings')
+    op.drop_constraint('ex_bookings_resource_busy', 'bookings')
+    op.drop_column('bookings', 'busy_until')
@@ -0,0 +1,110 @@
+"""unique customer phone
+
+Revision ID: 9e5a0c3f7d12
+Revises: 4b8d1f6e2a93
+Create Date: 2026-10-18 20:15:02.774190
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9e5a0c3f7d12'
+down_revision: Union[str, Sequence[str], None] = '4b8d1f6e2a93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# SQL twin of slotkeeper.utils.validators.normalize_phone: 11 digits starting
+# with 7 or 8 become +7XXXXXXXXXX, anything else is kept as entered
+_NORMALIZED_PHONE = r"""
+    CASE WHEN regexp_replace(phone, '\D', '', 'g') ~ '^[78][0-9]{10}$'
+         THEN '+7' || substr(regexp_replace(phone, '\D', '', 'g'), 2)
+         ELSE phone
+    END
+"""
+
+_RANKED = f"""
+    WITH ranked AS (
+        SELECT id,
+               first_value(id) OVER (
+                   PARTITION BY {_NORMALIZED_PHONE} ORDER BY id DESC
+               ) AS keep_id
+        FROM customers
+    )
+"""
+
+
+# newest non-null value across the duplicates, as the upsert's COALESCE would
+_NEWEST = "(array_agg(c.{0} ORDER BY c.id DESC) FILTER (WHERE c.{0} IS NOT NULL))[1]"
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # keep the newest row per normalized phone, fill its gaps from the older
+    # ones, repoint bookings, drop the rest
+    op.execute(
+        f"""
+        {_RANKED}
+        , merged AS (
+            SELECT r.keep_id,
+                   {_NEWEST.format("guests")} AS guests,
+                   {_NEWEST.format("birth_date")} AS birth_date,
+                   {_NEWEST.format("age")} AS age
+            FROM customers c
+            JOIN ranked r ON r.id = c.id
+            GROUP BY r.keep_id
+            HAVING count(*) > 1
+        )
+        UPDATE customers c
+        SET guests = m.guests, birth_date = m.birth_date, age = m.age
+        FROM merged m
+        WHERE c.id = m.keep_id
+        """
+    )
+    op.execute(
+        f"""
+        {_RANKED}
+        UPDATE bookings b SET customer_id = r.keep_id
+        FROM ranked r
+        WHERE b.customer_id = r.id AND r.id <> r.keep_id
+        """
+    )
+    op.execute(
+        f"""
+        {_RANKED}
+        DELETE FROM customers c
+        USING ranked r
+        WHERE c.id = r.id AND r.id <> r.keep_id
+        """
+    )
+    op.execute(
+        f"""
+        UPDATE customers SET phone = {_NORMALIZED_PHONE}
+        WHERE phone IS DISTINCT FROM {_NORMALIZED_PHONE}
+        """
+    )
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ux_customers_phone', 'customers', ['phone'],
+            unique=True, postgresql_concurrently=True, if_not_exists=True,
+        )
+        op.drop_index(
+            'ix_customers_phone', table_name='customers',
+            postgresql_concurrently=True, if_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_customers_phone', 'customers', ['phone'],
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+        op.drop_index(
+            'ux_customers_phone', table_name='customers',
+            postgresql_concurrently=True, if_exists=True,
+        )
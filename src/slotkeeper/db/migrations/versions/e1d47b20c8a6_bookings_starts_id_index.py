@@ -0,0 +1,35 @@
+"""bookings (starts_at, id) index for keyset iteration
+
+Revision ID: e1d47b20c8a6
+Revises: 9e5a0c3f7d12
+Create Date: 2026-10-18 20:52:19.603417
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e1d47b20c8a6'
+down_revision: Union[str, Sequence[str], None] = '9e5a0c3f7d12'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_bookings_starts_id', 'bookings', ['starts_at', 'id'],
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_bookings_starts_id', table_name='bookings',
+            postgresql_concurrently=True, if_exists=True,
+        )
@@ -0,0 +1,39 @@
+"""scheduled jobs queue
+
+Revision ID: f3a9c1d27b54
+Revises: e1d47b20c8a6
+Create Date: 2026-10-18 22:14:37.508126
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3a9c1d27b54'
+down_revision: Union[str, Sequence[str], None] = 'e1d47b20c8a6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('scheduled_jobs',
+    sa.Column('id', sa.BigInteger(), nullable=False),
+    sa.Column('kind', sa.String(), nullable=False),
+    sa.Column('payload', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+    sa.Column('run_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_scheduled_jobs_run_at', 'scheduled_jobs', ['run_at'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_scheduled_jobs_run_at', table_name='scheduled_jobs')
+    op.drop_table('scheduled_jobs')
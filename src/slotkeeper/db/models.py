@@ -1,13 +1,34 @@
 from __future__ import annotations
+from datetime import timezone
 from sqlalchemy import (
     Column, Integer, BigInteger, String, Date, DateTime, Enum, Boolean,
-    ForeignKey, CheckConstraint, func
+    ForeignKey, CheckConstraint, Index, JSON, TypeDecorator, func, text
 )
+from sqlalchemy.dialects.postgresql import JSONB, ExcludeConstraint
 from sqlalchemy.orm import declarative_base, relationship
 import enum
 
 Base = declarative_base()
 
+# SQLite only autoincrements INTEGER PRIMARY KEY and drops tz offsets; these
+# keep the schema usable there (tests, benchmarks) and are no-ops on Postgres.
+BigID = BigInteger().with_variant(Integer, "sqlite")
+
+
+class UTCDateTime(TypeDecorator):
+    impl = DateTime(timezone=True)
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is not None and value.tzinfo is not None and dialect.name == "sqlite":
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        return value
+
+    def process_result_value(self, value, dialect):
+        if value is not None and value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return value
+
 class BookingStatusEnum(str, enum.Enum):
     draft = "draft"
     pending_review = "pending_review"
@@ -16,9 +37,11 @@ class BookingStatusEnum(str, enum.Enum):
     cancelled_by_client = "cancelled_by_client"
     expired = "expired"
 
+ACTIVE_SQL = "status IN ('pending_review', 'confirmed')"
+
 class Customer(Base):
     __tablename__ = "customers"
-    id = Column(BigInteger, primary_key=True)
+    id = Column(BigID, primary_key=True)
     full_name = Column(String, nullable=False)
     phone = Column(String, nullable=False)
     guests = Column(Integer, nullable=False)
@@ -26,29 +49,69 @@ class Customer(Base):
     age = Column(Integer, nullable=True)
     __table_args__ = (
         CheckConstraint("guests BETWEEN 1 AND 12", name="ck_customers_guests"),
+        Index("ux_customers_phone", "phone", unique=True),
     )
     bookings = relationship("Booking", back_populates="customer")
 
 class Booking(Base):
     __tablename__ = "bookings"
-    id = Column(BigInteger, primary_key=True)
+    id = Column(BigID, primary_key=True)
     customer_id = Column(BigInteger, ForeignKey("customers.id", ondelete="CASCADE"), nullable=False)
-    starts_at = Column(DateTime(timezone=True), nullable=False)
-    ends_at   = Column(DateTime(timezone=True), nullable=False)
+    starts_at = Column(UTCDateTime, nullable=False)
+    ends_at   = Column(UTCDateTime, nullable=False)
     status = Column(Enum(BookingStatusEnum, name="booking_status"), nullable=False, default=BookingStatusEnum.draft)
-    hold_deadline = Column(DateTime(timezone=True), nullable=True)
+    hold_deadline = Column(UTCDateTime, nullable=True)
     client_chat_id = Column(BigInteger, nullable=True)
-    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now(), onupdate=func.now())
+    resource_id = Column(BigInteger, ForeignKey("resources.id"), nullable=True)
+    busy_until = Column(UTCDateTime, nullable=False)
+    created_at = Column(UTCDateTime, nullable=False, server_default=func.now())
+    updated_at = Column(UTCDateTime, nullable=False, server_default=func.now(), onupdate=func.now())
     __table_args__ = (
         CheckConstraint("starts_at < ends_at", name="ck_bookings_time"),
+        Index("ix_bookings_status_ends_starts", "status", "ends_at", "starts_at"),
+        Index("ix_bookings_ends_starts", "ends_at", "starts_at"),
+        Index("ix_bookings_starts_id", "starts_at", "id"),
+        Index(
+            "ix_bookings_hold_deadline_pending",
+            "hold_deadline",
+            postgresql_where=text("status = 'pending_review'"),
+            sqlite_where=text("status = 'pending_review'"),
+        ),
+        Index(
+            "ix_bookings_client_chat_id",
+            "client_chat_id",
+            postgresql_where=text("client_chat_id IS NOT NULL"),
+            sqlite_where=text("client_chat_id IS NOT NULL"),
+        ),
+        Index("ix_bookings_customer_id", "customer_id"),
+        ExcludeConstraint(
+            (resource_id, "="),
+            (func.tstzrange(starts_at, busy_until), "&&"),
+            name="ex_bookings_resource_busy",
+            using="gist",
+            where=text(f"{ACTIVE_SQL} AND resource_id IS NOT NULL"),
+        ).ddl_if(dialect="postgresql"),
+        ExcludeConstraint(
+            (func.tstzrange(starts_at, busy_until), "&&"),
+            name="ex_bookings_venue_busy",
+            using="gist",
+            where=text(f"{ACTIVE_SQL} AND resource_id IS NULL"),
+        ).ddl_if(dialect="postgresql"),
     )
     customer = relationship("Customer", back_populates="bookings")
     services = relationship("BookingService", back_populates="booking", cascade="all, delete-orphan")
+    resource = relationship("Resource")
+
+class Resource(Base):
+    __tablename__ = "resources"
+    id = Column(BigID, primary_key=True)
+    name = Column(String, nullable=False, unique=True)
+    is_active = Column(Boolean, nullable=False, default=True)
+    sort_order = Column(Integer, nullable=False, default=100)
 
 class Service(Base):
     __tablename__ = "services"
-    id = Column(BigInteger, primary_key=True)
+    id = Column(BigID, primary_key=True)
     name = Column(String, nullable=False, unique=True)
     adult_only = Column(Boolean, nullable=False, default=False)
     is_active = Column(Boolean, nullable=False, default=True)
@@ -60,4 +123,16 @@ class BookingService(Base):
     service_id = Column(BigInteger, ForeignKey("services.id"), primary_key=True)
 
     booking = relationship("Booking", back_populates="services")
-    service = relationship("Service")
\ No newline at end of file
+    service = relationship("Service")
+
+class ScheduledJob(Base):
+    __tablename__ = "scheduled_jobs"
+    id = Column(BigID, primary_key=True)
+    kind = Column(String, nullable=False)
+    payload = Column(JSON().with_variant(JSONB, "postgresql"), nullable=False)
+    run_at = Column(UTCDateTime, nullable=False)
+    attempts = Column(Integer, nullable=False, default=0)
+    created_at = Column(UTCDateTime, nullable=False, server_default=func.now())
+    __table_args__ = (
+        Index("ix_scheduled_jobs_run_at", "run_at"),
+    )
@@ -1,21 +1,81 @@
 from __future__ import annotations
-from contextlib import contextmanager
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-from slotkeeper.config import Settings
+import logging
+import time
+from collections.abc import Awaitable, Callable, Hashable, Iterable
+from contextlib import asynccontextmanager, contextmanager
+from typing import TypeVar
 
-_settings = Settings()
+from sqlalchemy.exc import DBAPIError, InterfaceError, OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from slotkeeper.db.engine import async_sessions, sync_sessions
+
+
+class ReplicaRouter:
+    """Decides whether a read may be served by the replica.
+
+    Writers ``pin`` keys (a chat id, a touched date) for ``pin_seconds``;
+    a read naming any pinned key goes to the primary, so whoever just wrote
+    reads their own write despite replication lag. A replica that fails is
+    skipped for ``retry_seconds``.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = False,
+        pin_seconds: float = 5.0,
+        retry_seconds: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.configure(enabled=enabled, pin_seconds=pin_seconds, retry_seconds=retry_seconds)
+        self._clock = clock
+        self._pins: dict[Hashable, float] = {}
+        self._down_until = 0.0
+        self.failovers = 0
+
+    def configure(self, *, enabled: bool, pin_seconds: float, retry_seconds: float) -> None:
+        self.enabled = enabled
+        self.pin_seconds = pin_seconds
+        self.retry_seconds = retry_seconds
+
+    def pin(self, keys: Iterable[Hashable]) -> None:
+        now = self._clock()
+        for key in keys:
+            self._pins[key] = now + self.pin_seconds
+        if len(self._pins) > 1024:
+            self._pins = {k: t for k, t in self._pins.items() if t > now}
+
+    def pinned(self, key: Hashable) -> bool:
+        return self._pins.get(key, 0.0) > self._clock()
+
+    def mark_down(self) -> None:
+        self._down_until = self._clock() + self.retry_seconds
+        self.failovers += 1
+
+    @property
+    def healthy(self) -> bool:
+        return self._clock() >= self._down_until
+
+    def use_replica(self, keys: Iterable[Hashable] = ()) -> bool:
+        return self.enabled and self.healthy and not any(self.pinned(k) for k in keys)
+
+
+ROUTER = ReplicaRouter()
+
+T = TypeVar("T")
+
+
+def _replica_failure(exc: BaseException) -> bool:
+    if isinstance(exc, OSError):
+        return True
+    return isinstance(exc, DBAPIError) and (
+        exc.connection_invalidated or isinstance(exc, (OperationalError, InterfaceError))
+    )
 
-engine = create_engine(
-    _settings.DATABASE_URL,
-    pool_pre_ping=True,
-    future=True,
-)
-SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)
 
 @contextmanager
 def session_scope():
-    session = SessionLocal()
+    session = sync_sessions()()
     try:
         yield session
         session.commit()
@@ -24,3 +84,60 @@ def session_scope():
         raise
     finally:
         session.close()
+
+
+async def _replica_session() -> AsyncSession | None:
+    session = async_sessions("replica")()
+    try:
+        await session.connection()
+    except (DBAPIError, OSError) as exc:
+        logging.warning(
+            "replica unavailable, reading from primary for %ss: %s", ROUTER.retry_seconds, exc
+        )
+        ROUTER.mark_down()
+        await session.close()
+        return None
+    return session
+
+
+@asynccontextmanager
+async def async_session_scope(*, read_only: bool = False, keys: Iterable[Hashable] = ()):
+    """Session on the primary, or on the replica for a ``read_only`` scope
+    whose ``keys`` are not pinned by ``ROUTER``."""
+    session = await _replica_session() if read_only and ROUTER.use_replica(keys) else None
+    on_replica = session is not None
+    if session is None:
+        session = async_sessions("primary")()
+    session.info["replica"] = on_replica
+    async with session:
+        try:
+            yield session
+            await session.commit()
+        except Exception as exc:
+            if on_replica and _replica_failure(exc):
+                logging.warning(
+                    "replica failed mid-read, reading from primary for %ss: %s",
+                    ROUTER.retry_seconds,
+                    exc,
+                )
+                ROUTER.mark_down()
+            await session.rollback()
+            raise
+
+
+async def run_read(
+    fn: Callable[[AsyncSession], Awaitable[T]], *, keys: Iterable[Hashable] = ()
+) -> T:
+    """``fn`` in a ``read_only`` scope. If the replica fails partway it is
+    marked down and ``fn`` runs once more, on the primary."""
+    keys = tuple(keys)
+    on_replica = False
+    try:
+        async with async_session_scope(read_only=True, keys=keys) as session:
+            on_replica = session.info["replica"]
+            return await fn(session)
+    except Exception as exc:
+        if not (on_replica and _replica_failure(exc)):
+            raise
+    async with async_session_scope(keys=keys) as session:
+        return await fn(session)
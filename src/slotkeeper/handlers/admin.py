@@ -12,8 +12,11 @@ from aiogram import Router, F
 from aiogram.types import CallbackQuery, Message
 
 from slotkeeper.config import Settings
-from slotkeeper.core.booking.shared import repo_scope
+from slotkeeper.core.availability_cache import AVAILABILITY_CACHE
+from slotkeeper.core.booking.shared import read_repo, repo_scope
 from slotkeeper.core.booking.models import BookingStatus
+from slotkeeper.core.catalog import RESOURCES, SERVICES
+from slotkeeper.core.notify.notifier import NOTIFY
 from slotkeeper.ui.keyboards import contact_kb, start_kb
 
 router = Router()
@@ -32,47 +35,46 @@ async def admin_confirm(cb: CallbackQuery) -> None:
 
     booking_id = int(cb.data.split(":")[-1])
 
-    with repo_scope() as repo:
-        b = repo.get(booking_id)
-        if not b:
-            await cb.answer("Заявка не найдена.", show_alert=True)
-            return
-        if b.status != BookingStatus.pending_review:
-            await cb.answer(f"Статус уже {b.status}.", show_alert=True)
-            return
-
-        b.status = BookingStatus.confirmed
-        repo.update(b)
+    async with repo_scope(keys=(cb.from_user.id,)) as repo:
+        b = await repo.get(booking_id)
+        status = b.status if b else None
+        if status == BookingStatus.pending_review:
+            b.status = BookingStatus.confirmed
+            await repo.update(b)
+            if b.client_chat_id:
+                await NOTIFY.queue_messages(
+                    repo,
+                    [b.client_chat_id],
+                    (
+                        f"✅ Ваша бронь подтверждена!\n\n"
+                        f"📝 Заявка # {b.id}\n"
+                        f"🕓 {b.starts_at:%Y-%m-%d %H:%M} – {b.ends_at:%H:%M}\n"
+                        f"🚪 Зал: {RESOURCES.name(b.resource_id)}\n\n"
+                        f"ℹ️ Информация о месте:\n\n"
+                        f"📍 Адрес: {settings.PLACE_ADDRESS}\n"
+                        f"🗺 <a href='{settings.PLACE_MAP_URL}'>Открыть в карте</a>\n\n"
+                        f"Если остались вопросы — жмите кнопку ниже 'Связаться с менеджером.'."
+                    ),
+                    reply_markup=contact_kb(),
+                    parse_mode="HTML",
+                )
+                await NOTIFY.queue_messages(
+                    repo,
+                    [b.client_chat_id],
+                    "Если позже захотите оформить ещё одну бронь, нажми кнопку ниже:",
+                    reply_markup=start_kb(),
+                )
+
+    if status is None:
+        await cb.answer("Заявка не найдена.", show_alert=True)
+        return
+    if status != BookingStatus.pending_review:
+        await cb.answer(f"Статус уже {status}.", show_alert=True)
+        return
 
     with suppress(asyncio.TimeoutError):
         await cb.message.edit_text(cb.message.text + "\n\nСтатус: ✅ подтверждено.")
 
-
-    if b.client_chat_id:
-        try:
-            await cb.bot.send_message(
-                b.client_chat_id,
-                (
-                    f"✅ Ваша бронь подтверждена!\n\n"
-                    f"📝 Заявка # {b.id}\n"
-                    f"🕓 {b.starts_at:%Y-%m-%d %H:%M} – {b.ends_at:%H:%M}\n\n"
-                    f"ℹ️ Информация о месте:\n\n"
-                    f"📍 Адрес: {Settings().PLACE_ADDRESS}\n"
-                    f"🗺 <a href='{Settings().PLACE_MAP_URL}'>Открыть в карте</a>\n\n"
-                    f"Если остались вопросы — жмите кнопку ниже 'Связаться с менеджером.'."
-                ),
-                reply_markup=contact_kb(),
-                parse_mode="HTML",
-            )
-
-            await cb.bot.send_message(
-                b.client_chat_id,
-                "Если позже захотите оформить ещё одну бронь, нажми кнопку ниже:",
-                reply_markup=start_kb(),
-            )
-        except Exception:
-            pass
-
     await cb.answer("Подтверждено.")
 
 
@@ -85,26 +87,27 @@ async def admin_reject(cb: CallbackQuery) -> None:
 
     booking_id = int(cb.data.split(":")[-1])
 
-    from slotkeeper.core.booking.shared import repo_scope
-    with repo_scope() as repo:
-        b = repo.get(booking_id)
-        if not b:
-            await cb.answer("Заявка не найдена.", show_alert=True)
-            return
-        if b.status != BookingStatus.pending_review:
-            await cb.answer(f"Статус уже {b.status}.", show_alert=True)
-            return
-
-        b.status = BookingStatus.cancelled_by_admin
-        repo.update(b)
+    async with repo_scope(keys=(cb.from_user.id,)) as repo:
+        b = await repo.get(booking_id)
+        status = b.status if b else None
+        if status == BookingStatus.pending_review:
+            b.status = BookingStatus.cancelled_by_admin
+            await repo.update(b)
+            if b.client_chat_id:
+                await NOTIFY.queue_messages(
+                    repo, [b.client_chat_id], f"Заявка #{b.id} отклонена администратором."
+                )
+
+    if status is None:
+        await cb.answer("Заявка не найдена.", show_alert=True)
+        return
+    if status != BookingStatus.pending_review:
+        await cb.answer(f"Статус уже {status}.", show_alert=True)
+        return
 
     with suppress(asyncio.TimeoutError):
         await cb.message.edit_text(cb.message.text + "\n\nСтатус: 🛑 отклонено админом.")
 
-    if b.client_chat_id:
-        with suppress(asyncio.TimeoutError):
-            await cb.bot.send_message(b.client_chat_id, f"Заявка #{b.id} отклонена администратором.")
-
     await cb.answer("Отклонено.")
 
 
@@ -119,9 +122,6 @@ async def admin_report(message: Message) -> None:
     tz = ZoneInfo(settings.APP_TIMEZONE)
     now = datetime.now(tz)
 
-    with repo_scope() as repo:
-        all_bookings = repo.all()
-
     text = ["📊 *Отчёт по бронированиям*"]
     periods = {
         "Сегодня": now.replace(hour=0, minute=0, second=0, microsecond=0),
@@ -129,18 +129,23 @@ async def admin_report(message: Message) -> None:
         "Месяц": now - timedelta(days=30),
     }
 
-    for label, start in periods.items():
-        bookings = [b for b in all_bookings if b.starts_at >= start]
+    async def count(repo) -> dict[str, dict[str, int]]:
+        counts: dict[str, dict[str, int]] = {label: {} for label in periods}
+        async for b in repo.iter_bookings(start=min(periods.values())):
+            for label, start in periods.items():
+                if b.starts_at >= start:
+                    counts[label][b.status] = counts[label].get(b.status, 0) + 1
+        return counts
+
+    counts = await read_repo(count, keys=(message.from_user.id,))
 
-        total = len(bookings)
+    for label in periods:
+        stats = counts[label]
+        total = sum(stats.values())
         if total == 0:
             text.append(f"\n*{label}:* — нет заявок")
             continue
 
-        stats: dict[str, int] = {}
-        for b in bookings:
-            stats[b.status] = stats.get(b.status, 0) + 1
-
         confirmed = stats.get(BookingStatus.confirmed, 0)
         load = confirmed / total * 100
 
@@ -154,3 +159,35 @@ async def admin_report(message: Message) -> None:
         )
 
     await message.answer("\n".join(text), parse_mode=ParseMode.MARKDOWN)
+
+
+@router.message(CommandFilter("cache"))
+async def admin_cache_stats(message: Message) -> None:
+    settings = Settings()
+
+    if message.from_user.id not in settings.admin_ids:
+        await message.answer("❌ Недостаточно прав.")
+        return
+
+    stats = AVAILABILITY_CACHE.stats()
+    lookups = stats["hits"] + stats["misses"]
+    hit_rate = stats["hits"] / lookups * 100 if lookups else 0.0
+    await message.answer(
+        "🗄 Кэш доступности\n"
+        f"Записей: {stats['size']}/{stats['maxsize']}\n"
+        f"Попадания: {stats['hits']}, промахи: {stats['misses']} ({hit_rate:.1f}%)\n"
+        f"Вытеснено: {stats['evictions']}, инвалидаций: {stats['invalidations']}"
+    )
+
+
+@router.message(CommandFilter("services_reload"))
+async def admin_services_reload(message: Message) -> None:
+    settings = Settings()
+
+    if message.from_user.id not in settings.admin_ids:
+        await message.answer("❌ Недостаточно прав.")
+        return
+
+    async with repo_scope() as repo:
+        await SERVICES.load(repo)
+    await message.answer(f"🔄 Каталог услуг обновлён: {len(SERVICES.available(18))} активных.")
@@ -9,13 +9,21 @@ from slotkeeper.utils.validators import parse_guests, normalize_phone
 from slotkeeper.fsm.states import ClientFlow
 
 from zoneinfo import ZoneInfo
-from datetime import datetime, timedelta, date
-from slotkeeper.ui.keyboards import month_kb, services_kb
+from datetime import datetime
+from slotkeeper.ui.keyboards import month_kb, quick_pick_kb, services_kb
 from slotkeeper.config import Settings
+from slotkeeper.core.booking.shared import repo_scope
+from slotkeeper.core.catalog import SERVICES, service_ids
+from slotkeeper.core.schedule import booking_horizon, month_free_counts, nearest_free_starts
 
 router = Router()
 
 
+async def _available_services(age: int) -> list[tuple[int, str]]:
+    await SERVICES.ensure_fresh(repo_scope)
+    return [(s.id, s.name) for s in SERVICES.available(age)]
+
+
 @router.message(StateFilter(ClientFlow.ContactCollect))
 async def got_fullname_ask_phone(message: Message, state: FSMContext) -> None:
     text = (message.text or "").strip()
@@ -80,16 +88,7 @@ async def got_guests_show_services(message: Message, state: FSMContext) -> None:
     data = await state.get_data()
     age = data.get("age", 0)
 
-    available_services = [
-        "Просмотр фильмов (экран + проектор)",
-        "Sony PlayStation 5",
-        "караоке (колонка + 3 микрофона)",
-        "Настольные игры",
-        "Попкорн",
-        "Чай/Кофе",
-    ]
-    if age >= 18:
-        available_services.append("Кальян, табак, уголь (18+)")
+    available_services = await _available_services(age)
 
     await state.update_data(available_services=available_services, selected_services=[])
     await state.set_state(ClientFlow.Services)
@@ -103,7 +102,14 @@ async def got_guests_show_services(message: Message, state: FSMContext) -> None:
 async def got_services(cb: CallbackQuery, state: FSMContext) -> None:
     data = await state.get_data()
     available = data.get("available_services", [])
-    selected = data.get("selected_services", [])
+    selected = service_ids(data.get("selected_services", []))
+    if any(isinstance(s, str) for s in available):
+        # FSM session from before services were keyed by id: start the pick over
+        available = await _available_services(data.get("age", 0))
+        await state.update_data(available_services=available, selected_services=[])
+        await cb.message.edit_reply_markup(reply_markup=services_kb(available, []))
+        await cb.answer("Список услуг обновился, выберите заново.")
+        return
 
     code = cb.data.split(":")[1]
 
@@ -117,28 +123,43 @@ async def got_services(cb: CallbackQuery, state: FSMContext) -> None:
         tz = ZoneInfo(settings.APP_TIMEZONE)
         today = datetime.now(tz).date()
         y, m = today.year, today.month
-        total_months = y * 12 + (m - 1) + settings.MAX_MONTHS_AHEAD
-        max_year = total_months // 12
-        max_month = total_months % 12 + 1
-        max_day = date(max_year, max_month, 1) - timedelta(days=1)
+        min_day, max_day = booking_horizon(today, settings.MAX_MONTHS_AHEAD)
 
         await cb.message.edit_text(
             "📆 Теперь выбери день на календаре или введи дату ДД.ММ.ГГГГ:",
             reply_markup=month_kb(
-                y, m, settings.APP_TIMEZONE, min_date=today, max_date=max_day
+                y,
+                m,
+                settings.APP_TIMEZONE,
+                min_date=min_day,
+                max_date=max_day,
+                free_counts=await month_free_counts(y, m, settings, min_day, max_day),
             ),
         )
+        picks = await nearest_free_starts(
+            datetime.now(tz),
+            settings,
+            limit=settings.QUICK_PICK_COUNT,
+            max_days=settings.QUICK_PICK_DAYS,
+        )
+        if picks:
+            await cb.message.answer(
+                "⚡ Или выбери один из ближайших свободных стартов:",
+                reply_markup=quick_pick_kb([dt.isoformat() for dt in picks]),
+            )
         await state.set_state(ClientFlow.Summary)
         await cb.answer()
         return
 
-    idx = int(code)
-    service = available[idx]
+    service_id = int(code)
+    if service_id not in {sid for sid, _ in available}:
+        await cb.answer()
+        return
 
-    if service in selected:
-        selected.remove(service)
+    if service_id in selected:
+        selected.remove(service_id)
     else:
-        selected.append(service)
+        selected.append(service_id)
 
     await state.update_data(selected_services=selected)
 
@@ -1,6 +1,7 @@
 from __future__ import annotations
 from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
 from calendar import monthrange
+from collections.abc import Mapping
 from datetime import date
 
 
@@ -32,6 +33,20 @@ def times_kb(iso_list: list[str]) -> InlineKeyboardMarkup:
     return InlineKeyboardMarkup(inline_keyboard=rows)
 
 
+def quick_pick_kb(iso_list: list[str]) -> InlineKeyboardMarkup:
+    rows = []
+    row: list[InlineKeyboardButton] = []
+    for iso in iso_list:
+        label = f"{iso[8:10]}.{iso[5:7]} {iso[11:16]}"
+        row.append(InlineKeyboardButton(text=label, callback_data=f"tm:{iso}"))
+        if len(row) == 2:
+            rows.append(row)
+            row = []
+    if row:
+        rows.append(row)
+    return InlineKeyboardMarkup(inline_keyboard=rows)
+
+
 def admin_booking_actions_kb(booking_id: int) -> InlineKeyboardMarkup:
     return InlineKeyboardMarkup(
         inline_keyboard=[
@@ -47,8 +62,17 @@ def admin_booking_actions_kb(booking_id: int) -> InlineKeyboardMarkup:
     )
 
 
+def _struck(text: str) -> str:
+    return "".join(ch + "\u0336" for ch in text)
+
+
 def month_kb(
-        year: int, month: int, tz_name: str, min_date: date, max_date: date
+        year: int,
+        month: int,
+        tz_name: str,
+        min_date: date,
+        max_date: date,
+        free_counts: Mapping[date, int] | None = None,
 ) -> InlineKeyboardMarkup:
     days_in_month = monthrange(year, month)[1]
     first_day = date(year, month, 1)
@@ -77,8 +101,11 @@ def month_kb(
     for d in range(1, days_in_month + 1):
         cur = date(year, month, d)
         if min_date <= cur <= max_date:
-            cb = f"day:{cur.isoformat()}"
-            row.append(InlineKeyboardButton(text=str(d), callback_data=cb))
+            if free_counts is not None and not free_counts.get(cur, 0):
+                row.append(InlineKeyboardButton(text=_struck(str(d)), callback_data="noop"))
+            else:
+                cb = f"day:{cur.isoformat()}"
+                row.append(InlineKeyboardButton(text=str(d), callback_data=cb))
         else:
             row.append(InlineKeyboardButton(text="·", callback_data="noop"))
         if len(row) == 7:
@@ -122,13 +149,13 @@ def contact_kb() -> InlineKeyboardMarkup:
     ])
 
 
-def services_kb(services: list[str], selected: list[str]) -> InlineKeyboardMarkup:
+def services_kb(services: list[tuple[int, str]], selected: list[int]) -> InlineKeyboardMarkup:
     buttons = []
-    for i, service in enumerate(services):
-        mark = "✅ " if service in selected else ""
+    for service_id, name in services:
+        mark = "✅ " if service_id in selected else ""
         buttons.append([InlineKeyboardButton(
-            text=f"{mark}{service}",
-            callback_data=f"svc:{i}"
+            text=f"{mark}{name}",
+            callback_data=f"svc:{service_id}"
         )])
     buttons.append([InlineKeyboardButton(text="✅ Готово", callback_data="svc:done")])
     return InlineKeyboardMarkup(inline_keyboard=buttons)
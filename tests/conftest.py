@@ -0,0 +1,22 @@
+import os
+from contextlib import asynccontextmanager
+
+import pytest
+
+# Settings() requires these; tests never reach a real bot or database
+os.environ.setdefault("BOT_TOKEN", "test")
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+
+@pytest.fixture
+def fake_scope():
+    """Factory for a ``repo_scope`` stand-in whose every scope yields ``repo``."""
+
+    def make(repo):
+        @asynccontextmanager
+        async def scope(**_):
+            yield repo
+
+        return scope
+
+    return make
@@ -0,0 +1,163 @@
+import random
+from datetime import date, datetime, time, timedelta
+from zoneinfo import ZoneInfo
+
+from slotkeeper.core.availability import (
+    ResourceIndex,
+    free_gaps,
+    free_starts,
+    free_starts_batch,
+    generate_slots_for_day,
+    merge_busy,
+)
+from slotkeeper.core.models import BusySlot, TimeSlot, overlaps, with_buffers
+
+TZ = ZoneInfo("Europe/Moscow")
+DAY = TimeSlot(datetime(2025, 3, 10, tzinfo=TZ), datetime(2025, 3, 11, tzinfo=TZ))
+
+
+def _at(h: int, m: int = 0) -> datetime:
+    return DAY.start + timedelta(hours=h, minutes=m)
+
+
+def _brute_force(window, busy, duration, step, pre, post):
+    out = []
+    t = window.start
+    while t + duration <= window.end:
+        cand = with_buffers(TimeSlot(t, t + duration), pre, post)
+        if not any(overlaps(cand, b) for b in busy):
+            out.append(t)
+        t += step
+    return out
+
+
+def test_merge_busy_joins_touching_and_nested():
+    merged = merge_busy(
+        [
+            TimeSlot(_at(12), _at(13)),
+            TimeSlot(_at(10), _at(12)),
+            TimeSlot(_at(10, 30), _at(11)),
+            TimeSlot(_at(15), _at(16)),
+        ]
+    )
+    assert merged == [TimeSlot(_at(10), _at(13)), TimeSlot(_at(15), _at(16))]
+
+
+def test_free_starts_respects_buffers():
+    busy = [TimeSlot(_at(12), _at(14))]
+    starts = free_starts(
+        TimeSlot(_at(9), _at(18)),
+        busy,
+        duration=timedelta(hours=2),
+        step=timedelta(minutes=30),
+        pre_buffer=timedelta(minutes=30),
+        post_buffer=timedelta(hours=1),
+    )
+    assert starts == [_at(9), _at(14, 30), _at(15), _at(15, 30), _at(16)]
+
+
+def test_free_starts_matches_brute_force():
+    rnd = random.Random(7)
+    for _ in range(200):
+        busy = []
+        for _ in range(rnd.randint(0, 8)):
+            start = _at(rnd.randint(0, 22), rnd.choice([0, 15, 30, 45]))
+            busy.append(TimeSlot(start, start + timedelta(minutes=rnd.randint(15, 300))))
+        kwargs = dict(
+            duration=timedelta(minutes=rnd.choice([60, 120, 180])),
+            step=timedelta(minutes=rnd.choice([15, 30, 60])),
+            pre=timedelta(minutes=rnd.choice([0, 30])),
+            post=timedelta(minutes=rnd.choice([0, 60])),
+        )
+        expected = _brute_force(DAY, busy, **kwargs)
+        got = free_starts(
+            DAY,
+            busy,
+            duration=kwargs["duration"],
+            step=kwargs["step"],
+            pre_buffer=kwargs["pre"],
+            post_buffer=kwargs["post"],
+        )
+        assert got == expected
+
+
+def test_free_gaps_measure_up_to_next_booking_minus_cleaning():
+    busy = [TimeSlot(_at(14), _at(16)), TimeSlot(_at(20), _at(21))]
+    gaps = free_gaps(
+        TimeSlot(_at(9), _at(18)),
+        busy,
+        duration=timedelta(hours=2),
+        step=timedelta(hours=1),
+        post_buffer=timedelta(hours=1),
+        horizon=_at(23),
+    )
+    assert gaps == [
+        (_at(9), timedelta(hours=4)),
+        (_at(10), timedelta(hours=3)),
+        (_at(11), timedelta(hours=2)),
+        (_at(16), timedelta(hours=3)),
+    ]
+
+
+def test_resource_index_partitions_and_whole_venue_blocks():
+    busy = [
+        BusySlot(_at(10), _at(12), resource_id=1),
+        BusySlot(_at(11), _at(13), resource_id=2),
+        BusySlot(_at(18), _at(19)),
+    ]
+    index = ResourceIndex(busy, [1, 2, 3])
+
+    assert index.free_resources(_at(12), _at(13)) == [1, 3]
+    assert index.free_resources(_at(11), _at(12), post_buffer=timedelta(hours=1)) == [3]
+    assert index.free_resources(_at(18, 30), _at(20)) == []
+    assert ResourceIndex(busy).free_resources(_at(13), _at(14)) == [None]
+
+    window = TimeSlot(_at(10), _at(14))
+    gaps = index.free_gaps(window, duration=timedelta(hours=1), step=timedelta(hours=1))
+    assert gaps == [(_at(10), timedelta(hours=4)), (_at(11), timedelta(hours=3)),
+                    (_at(12), timedelta(hours=2)), (_at(13), timedelta(hours=1))]
+
+    two = ResourceIndex(busy, [1, 2])
+    assert two.free_starts(window, duration=timedelta(hours=1), step=timedelta(hours=1)) == [
+        _at(10), _at(12), _at(13)
+    ]
+
+
+def test_generate_slots_for_day_uses_engine():
+    slots = generate_slots_for_day(
+        _at(0),
+        tz_name="Europe/Moscow",
+        open_at=time(11, 0),
+        close_at=time(17, 0),
+        busy=[TimeSlot(_at(13), _at(14))],
+    )
+    assert [s.start for s in slots] == [_at(14, 30), _at(15)]
+    assert all(s.duration() == timedelta(hours=2) for s in slots)
+
+
+def test_free_starts_batch_matches_scalar_across_dst():
+    tz_name = "Europe/Riga"
+    tz = ZoneInfo(tz_name)
+    days = [date(2025, 3, 25) + timedelta(days=i) for i in range(10)]
+    rnd = random.Random(11)
+    busy = []
+    for d in days:
+        for _ in range(rnd.randint(0, 4)):
+            start = datetime(d.year, d.month, d.day, rnd.randint(0, 23), rnd.choice([0, 30]), tzinfo=tz)
+            busy.append(TimeSlot(start, start + timedelta(minutes=rnd.randint(30, 360))))
+    durations = [timedelta(hours=h) for h in (1, 2, 5)]
+    kwargs = dict(
+        step=timedelta(minutes=30),
+        pre_buffer=timedelta(minutes=30),
+        post_buffer=timedelta(minutes=60),
+    )
+
+    batch = free_starts_batch(days, busy, tz_name=tz_name, durations=durations, **kwargs)
+
+    for d in days:
+        day_start = datetime(d.year, d.month, d.day, tzinfo=tz)
+        window = TimeSlot(day_start, day_start + timedelta(days=1))
+        for dur in durations:
+            expected = free_starts(window, busy, duration=dur, **kwargs)
+            assert batch.starts(d, dur) == expected
+            assert batch.counts(dur)[days.index(d)] == len(expected)
@@ -0,0 +1,160 @@
+import asyncio
+from datetime import date, datetime, timedelta
+from zoneinfo import ZoneInfo
+
+from fakeredis import FakeAsyncRedis, FakeServer
+
+from slotkeeper.core.availability_cache import (
+    AvailabilityCache,
+    SharedAvailabilityCache,
+    decode_busy,
+    encode_busy,
+)
+from slotkeeper.core.models import BusySlot, TimeSlot
+
+TZ = ZoneInfo("Europe/Moscow")
+D1, D2, D3 = date(2025, 6, 1), date(2025, 6, 2), date(2025, 6, 3)
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _slot(day: date, h1: int, h2: int) -> TimeSlot:
+    base = datetime(day.year, day.month, day.day, tzinfo=TZ)
+    return TimeSlot(base + timedelta(hours=h1), base + timedelta(hours=h2))
+
+
+def test_hit_miss_and_lru_eviction():
+    cache = AvailabilityCache(maxsize=2)
+    assert cache.get(D1) is None
+    cache.put(D1, cache.version(D1), [_slot(D1, 10, 12)])
+    cache.put(D2, cache.version(D2), [])
+    assert cache.get(D1) == (_slot(D1, 10, 12),)
+    cache.put(D3, cache.version(D3), [])
+
+    assert cache.get(D2) is None
+    assert cache.get(D1) is not None
+    assert cache.stats() == {
+        "size": 2,
+        "maxsize": 2,
+        "hits": 2,
+        "misses": 2,
+        "evictions": 1,
+        "invalidations": 0,
+    }
+
+
+def test_ttl_expiry():
+    clock = FakeClock()
+    cache = AvailabilityCache(ttl_seconds=10, clock=clock)
+    cache.put(D1, cache.version(D1), [])
+    clock.now = 11
+    assert cache.get(D1) is None
+
+
+def test_put_after_concurrent_invalidation_is_dropped():
+    cache = AvailabilityCache()
+    token = cache.version(D1)
+    cache.invalidate([D1])
+    cache.put(D1, token, [])
+    assert cache.get(D1) is None
+
+
+def test_invalidate_spans_covers_post_buffer_across_midnight():
+    cache = AvailabilityCache(tz="Europe/Moscow", post_buffer=timedelta(hours=1))
+    for day in (D1, D2, D3):
+        cache.put(day, cache.version(day), [])
+
+    cache.invalidate_spans([_slot(D1, 21, 23)])
+    assert cache.get(D1) is None
+    assert cache.get(D2) is not None
+
+    cache.invalidate_spans([_slot(D2, 22, 24)])
+    assert cache.get(D2) is None
+    assert cache.get(D3) is None
+
+
+def test_busy_blob_roundtrip():
+    a, b = _slot(D1, 0, 2), _slot(D1, 22, 24)
+    busy = (BusySlot(a.start, a.end), BusySlot(b.start, b.end, resource_id=7))
+    blob = encode_busy(D1, "Europe/Moscow", busy)
+    assert len(blob) == 24
+    assert decode_busy(D1, "Europe/Moscow", blob) == busy
+
+
+def _shared(server: FakeServer) -> SharedAvailabilityCache:
+    cache = SharedAvailabilityCache(AvailabilityCache())
+    cache.set_runtime(FakeAsyncRedis(server=server), ttl_seconds=60)
+    return cache
+
+
+def test_shared_fill_is_dropped_after_a_concurrent_invalidation():
+    async def scenario():
+        cache = _shared(FakeServer())
+        busy = (BusySlot(_slot(D1, 10, 12).start, _slot(D1, 10, 12).end, resource_id=2),)
+
+        stale = await cache.versions([D1])
+        await cache.invalidate({D1})
+        await cache.put_many({D1: (stale[D1], busy)}, "Europe/Moscow")
+        assert await cache.get_many([D1], "Europe/Moscow") == {}
+
+        fresh = await cache.versions([D1])
+        await cache.put_many({D1: (fresh[D1], busy)}, "Europe/Moscow")
+        assert await cache.get_many([D1], "Europe/Moscow") == {D1: busy}
+
+    asyncio.run(scenario())
+
+
+def test_invalidation_reaches_other_processes():
+    async def scenario():
+        server = FakeServer()
+        writer, reader = _shared(server), _shared(server)
+        seen: list[list[date]] = []
+        reader.on_invalidate = seen.append
+        reader.start()
+        await asyncio.sleep(0.05)
+        version = reader.local.version(D1)
+        reader.local.put(D1, version, [_slot(D1, 10, 12)])
+
+        writer.invalidate_later({D1, D2})
+        for _ in range(100):
+            if seen:
+                break
+            await asyncio.sleep(0.01)
+        reader.redis = None
+        reader._listener.cancel()
+        return reader, seen
+
+    reader, seen = asyncio.run(scenario())
+    assert seen == [[D1, D2]]
+    assert reader.local.get(D1) is None
+
+
+def test_redis_outage_degrades_to_misses_and_invalidation_is_retried():
+    async def scenario():
+        server = FakeServer()
+        cache = _shared(server)
+        cache.retry_seconds = 0.01
+        await cache.put_many({D1: (0, [_slot(D1, 10, 12)])}, "Europe/Moscow")
+
+        server.connected = False
+        assert await cache.versions([D1]) == {}
+        assert await cache.get_many([D1], "Europe/Moscow") == {}
+        await cache.put_many({D1: (0, [])}, "Europe/Moscow")
+        cache.invalidate_later({D1})
+        await asyncio.sleep(0)
+        assert cache._unsent == {D1}
+        assert D1 in cache._pending
+
+        server.connected = True
+        await asyncio.wait_for(cache._retry, timeout=5)
+        assert not cache._unsent and not cache._pending
+        assert await cache.get_many([D1], "Europe/Moscow") == {}
+        assert await cache.versions([D1]) == {D1: 1}
+
+    asyncio.run(scenario())
@@ -0,0 +1,36 @@
+import asyncio
+
+from slotkeeper.core.catalog import ServiceCatalog, service_ids
+
+
+class FakeRepo:
+    def __init__(self, rows) -> None:
+        self.rows = rows
+        self.calls = 0
+
+    async def services(self, include_inactive: bool = False):
+        self.calls += 1
+        return self.rows
+
+
+def test_service_catalog_filters_and_reloads_on_ttl(fake_scope):
+    now = [0.0]
+    repo = FakeRepo([(1, "Кино", False, True), (2, "Кальян", True, True), (3, "Старое", False, False)])
+    catalog = ServiceCatalog(ttl_seconds=60, clock=lambda: now[0])
+    scope = fake_scope(repo)
+
+    asyncio.run(catalog.ensure_fresh(scope))
+    asyncio.run(catalog.ensure_fresh(scope))
+    assert repo.calls == 1
+    assert [s.id for s in catalog.available(age=17)] == [1]
+    assert [s.id for s in catalog.available(age=18)] == [1, 2]
+    assert catalog.names([3, 2]) == ["Старое", "Кальян"]
+
+    now[0] = 61
+    asyncio.run(catalog.ensure_fresh(scope))
+    assert repo.calls == 2
+
+
+def test_service_ids_drop_names_from_old_sessions():
+    assert service_ids([3, "Попкорн", 1]) == [3, 1]
+    assert service_ids(["Кино"]) == []
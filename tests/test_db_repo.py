@@ -0,0 +1,274 @@
+import asyncio
+from dataclasses import replace
+from datetime import date, datetime, timedelta
+from zoneinfo import ZoneInfo
+
+import pytest
+from sqlalchemy import create_engine, event, insert, select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import Session
+
+from slotkeeper.core.booking import db_repo
+from slotkeeper.core.booking.db_repo import (
+    AsyncDBRepo,
+    DBRepo,
+    _bookings_page_stmt,
+    _busy_spans_stmt,
+    _create_hold_stmt,
+    _customer_upsert_stmt,
+    _expire_holds_stmt,
+    _has_conflict_stmt,
+)
+from slotkeeper.core.booking.models import Booking, BookingStatus, Customer
+from slotkeeper.core.models import TimeSlot
+from slotkeeper.db.models import Base, Resource, ScheduledJob, Service
+from slotkeeper.db.models import Booking as DBBooking
+from slotkeeper.db.models import Customer as DBCustomer
+
+TZ = ZoneInfo("Europe/Moscow")
+
+
+def _at(h: int) -> datetime:
+    return datetime(2025, 6, 1, tzinfo=TZ) + timedelta(hours=h)
+
+
+def test_busy_spans_and_conflicts_on_sqlite():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with Session(engine) as s:
+        s.add_all([Resource(id=1, name="A", sort_order=1), Resource(id=2, name="B", sort_order=2)])
+        repo = DBRepo(s, timedelta(0))
+        cust = Customer(full_name="Иван", phone="+7", guests=2)
+        for h, status, rid in ((10, BookingStatus.confirmed, 1), (14, BookingStatus.expired, 2)):
+            repo.add(Booking(0, cust, _at(h), _at(h + 2), status, resource_id=rid))
+        s.commit()
+        s.expunge_all()
+
+        spans = repo.busy_spans(_at(0), _at(24), timedelta(hours=1))
+        assert [(b.start, b.end, b.resource_id) for b in spans] == [(_at(10), _at(13), 1)]
+        assert spans[0].start.utcoffset() == timedelta(0)
+        assert [b.resource_id for b in repo.conflicts(_at(11), _at(15))] == [1]
+        assert repo.conflicts(_at(11), _at(15), 2) == []
+        assert repo.has_conflict(_at(11), _at(15), 1)
+        assert not repo.has_conflict(_at(11), _at(15), 2)
+        assert repo.get(1).customer.full_name == "Иван"
+        assert len(s.identity_map) == 0
+        assert repo.resources() == [(1, "A"), (2, "B")]
+        with pytest.raises(ValueError):
+            repo.add(Booking(0, cust, _at(0), _at(25), BookingStatus.confirmed))
+
+
+def test_customers_are_upserted_by_normalized_phone():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with Session(engine) as s:
+        repo = DBRepo(s, timedelta(0))
+        first = Customer(full_name="Иван", phone="8 904 555 01 23", guests=2, birth_date=date(1990, 5, 1))
+        repo.add(Booking(0, first, _at(10), _at(12), BookingStatus.confirmed))
+        second = Customer(full_name="Иван П.", phone="+7 904 555-01-23", guests=4)
+        booking = repo.add(Booking(0, second, _at(14), _at(16), BookingStatus.confirmed))
+        s.commit()
+
+        assert s.query(DBCustomer).count() == 1
+        assert booking.customer == Customer("Иван П.", "+79045550123", 4, date(1990, 5, 1))
+
+        statements: list[str] = []
+        event.listen(engine, "before_cursor_execute", lambda *a: statements.append(a[2]))
+        booking.status = BookingStatus.cancelled_by_admin
+        repo.update(booking)
+        assert not [sql for sql in statements if sql.startswith("INSERT INTO customers")]
+        booking.customer = replace(booking.customer, guests=5)
+        assert repo.update(booking).customer.guests == 5
+
+
+def test_create_hold_writes_booking_and_services():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with Session(engine) as s:
+        s.add_all([Service(id=1, name="Кино"), Service(id=2, name="Попкорн")])
+        s.commit()
+        repo = DBRepo(s, post_buffer=timedelta(hours=1))
+        booking = Booking(0, Customer("Иван", "8 904 555 01 23", 2), _at(10), _at(12), BookingStatus.draft)
+        booking.set_hold(minutes=30, tz="Europe/Moscow")
+
+        held = repo.create_hold(booking, services=[1, 2])
+        s.commit()
+
+        assert held.id > 0 and held.customer.phone == "+79045550123"
+        stored = s.get(DBBooking, held.id)
+        assert stored.status.value == "pending_review"
+        assert stored.busy_until == _at(13)
+        assert sorted(bs.service_id for bs in stored.services) == [1, 2]
+        assert repo.touched == [TimeSlot(_at(10), _at(12))]
+
+        assert repo.pending_holds() == [(booking.hold_deadline, held.id)]
+        assert repo.mark_expired_if_held_and_due(booking.hold_deadline - timedelta(seconds=1)) == []
+        assert repo.mark_expired_if_held_and_due(booking.hold_deadline) == [held.id]
+        s.commit()
+        s.expire_all()
+        assert s.get(DBBooking, held.id).status.value == "expired"
+        assert repo.pending_holds() == []
+
+        other = DBRepo(s, timedelta(0))
+        other.update(replace(held, status=BookingStatus.confirmed))
+        assert s.get(DBBooking, held.id).busy_until == _at(13)
+        other.update(replace(held, ends_at=_at(11)))
+        assert s.get(DBBooking, held.id).busy_until == _at(11)
+
+
+
+def test_async_repo_on_aiosqlite(tmp_path):
+    async def scenario():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'slotkeeper.db'}")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        async with AsyncSession(engine) as s:
+            s.add(Service(id=1, name="Кино"))
+            await s.commit()
+            repo = AsyncDBRepo(s, post_buffer=timedelta(hours=1))
+            booking = Booking(0, Customer("Иван", "8 904 555 01 23", 2), _at(10), _at(12), BookingStatus.draft)
+            booking.set_hold(minutes=30, tz="Europe/Moscow")
+
+            held = await repo.create_hold(booking, services=[1])
+            await s.commit()
+            spans = await repo.busy_spans(_at(0), _at(24), timedelta(hours=1))
+            assert [(b.start, b.end) for b in spans] == [(_at(10), _at(13))]
+            assert [b async for b in repo.iter_busy_spans(_at(0), _at(24), timedelta(hours=1))] == spans
+
+            await repo.update(replace(held, ends_at=_at(14), status=BookingStatus.confirmed))
+            await s.commit()
+            stored = await repo.get(held.id)
+            assert (stored.ends_at, stored.status) == (_at(14), BookingStatus.confirmed)
+            assert await repo.has_conflict(_at(13), _at(15))
+        await engine.dispose()
+
+    asyncio.run(scenario())
+
+
+def test_taken_slot_keeps_the_transaction_for_the_next_resource(monkeypatch):
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        # stands in for the Postgres exclusion constraint on (resource_id, busy range)
+        conn.exec_driver_sql(
+            """
+            CREATE TRIGGER bookings_busy_excl BEFORE INSERT ON bookings
+            WHEN EXISTS (
+                SELECT 1 FROM bookings o WHERE o.resource_id = NEW.resource_id
+                AND o.starts_at < NEW.busy_until AND NEW.starts_at < o.busy_until
+            )
+            BEGIN SELECT RAISE(ABORT, 'slot taken'); END
+            """
+        )
+    monkeypatch.setattr(db_repo, "_is_exclusion_violation", lambda exc: "slot taken" in str(exc.orig))
+    with Session(engine) as s:
+        s.add_all([Resource(id=1, name="A", sort_order=1), Resource(id=2, name="B", sort_order=2)])
+        s.commit()
+        repo = DBRepo(s, post_buffer=timedelta(hours=1))
+        repo.add(Booking(0, Customer("Пётр", "+79040000000", 2), _at(10), _at(12), BookingStatus.confirmed, resource_id=1))
+        job_id = repo.enqueue_job("send_message", {"chat_id": 1, "text": "x"}, _at(0))
+
+        booking = Booking(0, Customer("Иван", "+79045550123", 2), _at(11), _at(13), BookingStatus.draft)
+        booking.set_hold(minutes=30, tz="Europe/Moscow")
+        assert repo.create_hold(replace(booking, resource_id=1)) is None
+        held = repo.create_hold(replace(booking, resource_id=2))
+        s.commit()
+
+        assert held is not None and held.resource_id == 2
+        assert sorted(s.scalars(select(DBBooking.resource_id))) == [1, 2]
+        assert s.get(ScheduledJob, job_id) is not None
+        assert s.query(DBCustomer).count() == 2
+
+
+def test_create_hold_is_one_chained_statement_on_postgres():
+    customer = _customer_upsert_stmt(Customer("Иван", "+79045550123", 2), "postgresql")
+    values = {"starts_at": _at(10), "ends_at": _at(12), "status": "pending_review"}
+    stmt = _create_hold_stmt(customer.returning(DBCustomer.id), values, [1, 2])
+    sql = " ".join(str(stmt.compile(dialect=postgresql.dialect())).split())
+
+    assert sql.startswith("WITH c AS (INSERT INTO customers")
+    assert "ON CONFLICT (phone) DO UPDATE" in sql and "RETURNING customers.id" in sql
+    assert "b AS (INSERT INTO bookings (customer_id, starts_at, ends_at, status) SELECT c.id" in sql
+    assert "RETURNING bookings.id" in sql
+    assert "s AS (INSERT INTO booking_services (booking_id, service_id) SELECT b.id AS id, unnest(" in sql
+    assert sql.endswith("SELECT b.id FROM b")
+
+
+def test_iter_bookings_pages_by_keyset_with_filters():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with Session(engine) as s:
+        repo = DBRepo(s, timedelta(0))
+        for i in range(7):
+            status = BookingStatus.confirmed if i % 2 else BookingStatus.expired
+            repo.add(Booking(0, Customer("Иван", "+7", 2), _at(10), _at(11), status, client_chat_id=i % 3))
+        repo.add(Booking(0, Customer("Иван", "+7", 2), _at(9), _at(10), BookingStatus.confirmed))
+        s.commit()
+
+        assert [b.id for b in repo.iter_bookings(page_size=3)] == [8, 1, 2, 3, 4, 5, 6, 7]
+        confirmed = repo.iter_bookings(page_size=2, statuses={BookingStatus.confirmed}, start=_at(10))
+        assert [b.id for b in confirmed] == [2, 4, 6]
+        assert [b.id for b in repo.iter_bookings(client_chat_id=1)] == [2, 5]
+
+
+def _plan(conn, stmt) -> str:
+    compiled = stmt.compile(conn, compile_kwargs={"render_postcompile": True})
+    params = compiled.construct_params()
+    args = tuple(
+        v.astimezone(ZoneInfo("UTC")).replace(tzinfo=None) if isinstance(v, datetime) else v
+        for v in (params[k] for k in compiled.positiontup)
+    )
+    rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}", args)
+    return " | ".join(r[-1] for r in rows)
+
+
+def test_hot_path_queries_use_indexes():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(DBCustomer), [{"id": 1, "full_name": "a", "phone": "+7", "guests": 1}])
+        rows = []
+        for i in range(2000):
+            start = _at(3 * i)
+            pending = i % 50 == 0
+            rows.append({
+                "customer_id": 1, "starts_at": start, "ends_at": start + timedelta(hours=2),
+                "busy_until": start + timedelta(hours=3),
+                "status": "pending_review" if pending else "confirmed",
+                "hold_deadline": start if pending else None,
+            })
+        conn.execute(insert(DBBooking), rows)
+        conn.exec_driver_sql("ANALYZE")
+
+        day = _at(24 * 200)
+        busy = _plan(conn, _busy_spans_stmt(day, day + timedelta(days=1), timedelta(hours=1)))
+        assert "USING INDEX ix_bookings_status_ends_starts (status=? AND ends_at>?" in busy
+        conflicts = _plan(conn, _has_conflict_stmt(day, day + timedelta(hours=3)))
+        assert "USING INDEX ix_bookings_status_ends_starts (status=? AND ends_at>?" in conflicts
+        holds = _plan(conn, _expire_holds_stmt(day))
+        assert "USING INDEX ix_bookings_hold_deadline_pending" in holds
+        page = _plan(conn, _bookings_page_stmt((day, 10), 500, None, None, None, None))
+        assert "USING INDEX ix_bookings_starts_id" in page and "TEMP B-TREE" not in page
+
+
+def test_job_queue_claims_due_jobs_once():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with Session(engine) as s:
+        repo = DBRepo(s, timedelta(0))
+        first = repo.enqueue_job("hold_warning", {"booking_id": 1}, _at(10))
+        repo.enqueue_job("hold_warning", {"booking_id": 2}, _at(12))
+        s.commit()
+
+        jobs = repo.claim_jobs(_at(11), 10, timedelta(minutes=1))
+        assert [(j.id, j.payload, j.attempts) for j in jobs] == [(first, {"booking_id": 1}, 1)]
+        assert repo.claim_jobs(_at(11), 10, timedelta(minutes=1)) == []
+        assert repo.next_job_at() == _at(11) + timedelta(minutes=1)
+        repo.extend_jobs([first], _at(11) + timedelta(minutes=30))
+        assert repo.claim_jobs(_at(11) + timedelta(minutes=5), 10, timedelta(minutes=1)) == []
+
+        repo.retry_job(first, _at(13))
+        assert sorted(j.attempts for j in repo.claim_jobs(_at(13), 10, timedelta(minutes=1))) == [1, 2]
+        repo.finish_jobs([first])
+        assert repo.next_job_at() == _at(13) + timedelta(minutes=1)
@@ -0,0 +1,94 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+from slotkeeper.core.booking.hold import HoldManager
+
+T0 = datetime(2025, 6, 1, 12, tzinfo=timezone.utc)
+
+
+class FakeRepo:
+    def __init__(self) -> None:
+        self.holds: dict[int, datetime] = {}
+        self.expired: list[tuple[int, datetime]] = []
+
+    async def pending_holds(self):
+        return [(deadline, bid) for bid, deadline in self.holds.items()]
+
+    async def mark_expired_if_held_and_due(self, now):
+        due = [bid for bid, deadline in self.holds.items() if deadline <= now]
+        for bid in due:
+            del self.holds[bid]
+            self.expired.append((bid, now))
+        return due
+
+
+def test_holds_expire_in_deadline_order(fake_scope):
+    async def scenario():
+        repo = FakeRepo()
+        repo.holds = {1: T0 + timedelta(minutes=30), 3: T0 + timedelta(minutes=60)}
+        manager = HoldManager(scope=fake_scope(repo), tz="UTC")
+        await manager._resync()
+
+        repo.holds[2] = T0 + timedelta(minutes=10)
+        manager.push(2, repo.holds[2])
+        assert manager._wake.is_set()
+        manager._wake.clear()
+        manager.push(3, repo.holds[3])
+        assert not manager._wake.is_set()
+
+        await manager._expire_due(T0 + timedelta(minutes=10))
+        assert [bid for bid, _ in repo.expired] == [2]
+        assert manager._heap[0] == (T0 + timedelta(minutes=30), 1)
+
+        await manager._expire_due(T0 + timedelta(minutes=30))
+        assert [bid for bid, _ in repo.expired] == [2, 1]
+        await manager._resync()
+        assert sorted(manager._heap) == [(T0 + timedelta(minutes=60), 3)]
+
+    asyncio.run(scenario())
+
+
+class FakeLease:
+    owner: list = [None]
+
+    def __init__(self, name: str, broken: bool = False) -> None:
+        self.name = name
+        self.broken = broken
+        self.ttl_seconds = 15
+
+    async def refresh(self) -> bool:
+        if self.broken:
+            raise RedisConnectionError("redis down")
+        if self.owner[0] in (None, self.name):
+            self.owner[0] = self.name
+            return True
+        return False
+
+    async def release(self) -> None:
+        if self.owner[0] == self.name:
+            self.owner[0] = None
+
+
+def test_only_the_lease_holder_sweeps_and_a_standby_takes_over(fake_scope):
+    async def scenario():
+        FakeLease.owner[0] = None
+        repo = FakeRepo()
+        first = HoldManager(scope=fake_scope(repo), tz="UTC", lease=FakeLease("a"))
+        second = HoldManager(scope=fake_scope(repo), tz="UTC", lease=FakeLease("b"))
+        second.push(1, T0)
+
+        assert await first._elect()
+        assert not await second._elect()
+        assert (first.leader, second.leader) == (True, False)
+        assert second._heap == []
+
+        await first.stop()
+        assert not first.leader
+        assert await second._elect()
+
+        orphan = HoldManager(scope=fake_scope(repo), tz="UTC", lease=FakeLease("c", broken=True))
+        assert await orphan._elect()
+
+    asyncio.run(scenario())
@@ -0,0 +1,76 @@
+import asyncio
+from datetime import datetime, timezone
+
+from slotkeeper.core.jobs import Job, JobDispatcher
+
+
+class FakeRepo:
+    def __init__(self, jobs) -> None:
+        self.jobs = jobs
+        self.finished: list[int] = []
+        self.retried: list[int] = []
+        self.extended: list[list[int]] = []
+        self.claims = 0
+
+    async def claim_jobs(self, now, limit, lock_for):
+        self.claims += 1
+        claimed, self.jobs = self.jobs[:limit], self.jobs[limit:]
+        return claimed
+
+    async def extend_jobs(self, job_ids, run_at):
+        self.extended.append(list(job_ids))
+
+    async def next_job_at(self):
+        return None
+
+    async def finish_jobs(self, job_ids):
+        self.finished.extend(job_ids)
+
+    async def retry_job(self, job_id, run_at):
+        assert run_at > datetime.now(timezone.utc)
+        self.retried.append(job_id)
+
+
+def test_dispatch_acks_done_jobs_and_retries_failures(fake_scope):
+    seen: list[int] = []
+
+    async def warn(payload):
+        if payload["booking_id"] == 2:
+            raise RuntimeError("telegram down")
+        seen.append(payload["booking_id"])
+
+    repo = FakeRepo([
+        Job(1, "hold_warning", {"booking_id": 1}, 1),
+        Job(2, "hold_warning", {"booking_id": 2}, 1),
+        Job(3, "hold_warning", {"booking_id": 2}, 5),
+        Job(4, "unknown", {}, 1),
+    ])
+    jobs = JobDispatcher(fake_scope(repo), batch_size=10, max_attempts=5)
+    jobs.register("hold_warning", warn)
+
+    assert asyncio.run(jobs.dispatch_due()) == 4
+    assert seen == [1]
+    assert sorted(repo.finished) == [1, 3, 4]
+    assert repo.retried == [2]
+
+
+def test_slow_jobs_keep_their_lease_and_a_wake_during_dispatch_is_kept(fake_scope):
+    async def scenario():
+        repo = FakeRepo([Job(1, "send", {}, 1)])
+        jobs = JobDispatcher(fake_scope(repo), poll_seconds=60, lock_seconds=0.003)
+
+        async def slow_send(payload):
+            jobs.wake()
+            while not repo.extended:
+                await asyncio.sleep(0.001)
+
+        jobs.register("send", slow_send)
+        jobs.start()
+        while repo.claims < 2:
+            await asyncio.sleep(0.001)
+        await jobs.stop()
+        return repo
+
+    repo = asyncio.run(asyncio.wait_for(scenario(), timeout=5))
+    assert repo.extended[0] == [1]
+    assert repo.finished == [1]
@@ -0,0 +1,102 @@
+import asyncio
+import json
+
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.methods import SendMessage
+
+from slotkeeper.core.notify.notifier import NOTIFY, SEND_MESSAGE
+from slotkeeper.core.notify.outbound import OUTBOUND, MessageDispatcher, TokenBucket
+from slotkeeper.ui.keyboards import admin_booking_actions_kb
+
+
+def test_token_bucket_paces_after_burst():
+    now = [0.0]
+    bucket = TokenBucket(rate=2, capacity=2, clock=lambda: now[0])
+    assert [bucket.take(), bucket.take()] == [0, 0]
+    assert bucket.take() == 0.5
+    now[0] = 0.5
+    assert bucket.take() == 0
+
+
+class FakeBot:
+    def __init__(self) -> None:
+        self.sent: list[tuple[int, str]] = []
+        self.flooded = False
+
+    async def send_message(self, chat_id, text, **kwargs):
+        if chat_id == 1 and not self.flooded:
+            self.flooded = True
+            raise TelegramRetryAfter(SendMessage(chat_id=chat_id, text=text), "flood", 0)
+        await asyncio.sleep(0.01)
+        self.sent.append((chat_id, text))
+
+
+def test_dispatcher_fans_out_keeps_chat_order_and_retries_flood_wait():
+    async def scenario():
+        bot = FakeBot()
+        outbound = MessageDispatcher(workers=4, chat_rate=100, chat_burst=10)
+        outbound.set_runtime(bot)
+        outbound.start()
+        outbound.send_many([1, 2, 3], "new")
+        outbound.send(1, "second")
+        await outbound.stop()
+        return bot.sent
+
+    sent = asyncio.run(scenario())
+    assert sorted(sent) == [(1, "new"), (1, "second"), (2, "new"), (3, "new")]
+    assert [text for chat, text in sent if chat == 1] == ["new", "second"]
+
+
+class OutboxRepo:
+    def __init__(self) -> None:
+        self.jobs: list[tuple[str, dict]] = []
+
+    async def enqueue_job(self, kind, payload, run_at):
+        self.jobs.append((kind, json.loads(json.dumps(payload))))
+
+
+def test_outbox_message_survives_json_and_is_delivered(monkeypatch):
+    sent: list[tuple[int, str, dict]] = []
+
+    class Bot:
+        async def send_message(self, chat_id, text, **kwargs):
+            sent.append((chat_id, text, kwargs))
+
+    monkeypatch.setattr(OUTBOUND, "bot", Bot())
+    repo = OutboxRepo()
+    markup = admin_booking_actions_kb(7)
+
+    async def scenario():
+        await NOTIFY.queue_messages(repo, [10, 11], "new", reply_markup=markup, parse_mode="HTML")
+        for kind, payload in repo.jobs:
+            assert kind == SEND_MESSAGE
+            await NOTIFY.send_message(payload)
+
+    asyncio.run(scenario())
+    assert [(chat, text) for chat, text, _ in sent] == [(10, "new"), (11, "new")]
+    assert sent[0][2] == {"parse_mode": "HTML", "reply_markup": markup}
+
+
+def test_flood_wait_parks_the_chat_without_holding_a_worker():
+    sent: list[tuple[int, str]] = []
+
+    class FloodBot:
+        flooded = False
+
+        async def send_message(self, chat_id, text, **kwargs):
+            if chat_id == 1 and not self.flooded:
+                self.flooded = True
+                raise TelegramRetryAfter(SendMessage(chat_id=chat_id, text=text), "flood", 0.05)
+            sent.append((chat_id, text))
+
+    async def scenario():
+        outbound = MessageDispatcher(workers=1, chat_rate=100, chat_burst=10)
+        outbound.set_runtime(FloodBot())
+        outbound.start()
+        outbound.send(1, "a")
+        outbound.send(1, "b")
+        outbound.send(2, "c")
+        await outbound.stop()
+
+    asyncio.run(scenario())
+    assert sent == [(2, "c"), (1, "a"), (1, "b")]
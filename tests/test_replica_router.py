@@ -0,0 +1,77 @@
+import asyncio
+from datetime import date
+
+import pytest
+from sqlalchemy.exc import OperationalError
+
+from slotkeeper.db import session
+from slotkeeper.db.session import ReplicaRouter
+
+
+def test_router_pins_writers_and_skips_a_failed_replica():
+    now = [0.0]
+    router = ReplicaRouter(enabled=True, pin_seconds=5, retry_seconds=30, clock=lambda: now[0])
+    assert router.use_replica([42, date(2025, 6, 1)])
+
+    router.pin([42, date(2025, 6, 1)])
+    assert not router.use_replica([42])
+    assert not router.use_replica([7, date(2025, 6, 1)])
+    assert router.use_replica([7, date(2025, 6, 2)])
+
+    now[0] = 6
+    assert router.use_replica([42, date(2025, 6, 1)])
+
+    router.mark_down()
+    assert not router.use_replica()
+    now[0] = 36
+    assert router.use_replica()
+    assert not ReplicaRouter(enabled=False).use_replica()
+
+
+class FakeSession:
+    def __init__(self, role: str) -> None:
+        self.role = role
+        self.info: dict = {}
+
+    async def connection(self):
+        return None
+
+    async def commit(self):
+        pass
+
+    async def rollback(self):
+        pass
+
+    async def close(self):
+        pass
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+def test_read_fails_over_to_primary_once_when_replica_dies_mid_read(monkeypatch):
+    router = ReplicaRouter(enabled=True)
+    monkeypatch.setattr(session, "ROUTER", router)
+    monkeypatch.setattr(session, "async_sessions", lambda role="primary": lambda: FakeSession(role))
+    calls: list[str] = []
+
+    async def read(s):
+        calls.append(s.role)
+        if s.role == "replica":
+            raise OperationalError("SELECT 1", {}, ConnectionResetError("reset"))
+        return "rows"
+
+    assert asyncio.run(session.run_read(read, keys=[7])) == "rows"
+    assert calls == ["replica", "primary"]
+    assert not router.healthy and router.failovers == 1
+
+    async def broken(s):
+        raise ValueError("bug")
+
+    router.configure(enabled=True, pin_seconds=5, retry_seconds=0)
+    with pytest.raises(ValueError):
+        asyncio.run(session.run_read(broken))
+    assert router.failovers == 1
@@ -0,0 +1,93 @@
+import asyncio
+import random
+from datetime import date, datetime, time, timedelta
+from zoneinfo import ZoneInfo
+
+from slotkeeper.config import Settings
+from slotkeeper.core import schedule
+from slotkeeper.core.availability import ResourceIndex
+from slotkeeper.core.models import BusySlot, TimeSlot
+
+TZ_NAME = "Europe/Riga"
+TZ = ZoneInfo(TZ_NAME)
+
+
+def _random_busy(days, resources, seed):
+    rnd = random.Random(seed)
+    busy = []
+    for d in days:
+        for _ in range(rnd.randint(0, 4)):
+            start = datetime(d.year, d.month, d.day, rnd.randint(0, 23), rnd.choice([0, 30]), tzinfo=TZ)
+            end = start + timedelta(minutes=rnd.randint(30, 360))
+            busy.append(BusySlot(start, end, resource_id=rnd.choice([*resources, None])))
+    return busy
+
+
+def test_month_free_counts_matches_scalar_across_dst(monkeypatch):
+    settings = Settings(BOT_TOKEN="x", APP_TIMEZONE=TZ_NAME)
+    days = [date(2025, 3, 1) + timedelta(days=i) for i in range(31)]
+    index = ResourceIndex(_random_busy(days, [1, 2], seed=5), [1, 2])
+
+    async def index_between(span, settings):
+        return index
+
+    monkeypatch.setattr(schedule, "_index_between", index_between)
+    counts = asyncio.run(
+        schedule.month_free_counts(2025, 3, settings, date(2025, 3, 1), date(2025, 3, 31))
+    )
+
+    post_buf = timedelta(minutes=settings.CLEANING_POST_MIN)
+    for d in days:
+        starts = index.free_starts(
+            schedule.day_window(d, TZ_NAME),
+            duration=timedelta(minutes=settings.SLOT_DEFAULT_MIN),
+            step=timedelta(minutes=settings.SLOT_STEP_MIN),
+            post_buffer=post_buf,
+        )
+        visible = [t for t in starts if schedule.DISPLAY_START_HOUR <= t.hour < schedule.DISPLAY_END_HOUR]
+        assert counts[d] == len(visible), d
+
+
+class SpanRepo:
+    def __init__(self, busy) -> None:
+        self.busy = sorted(busy, key=lambda b: b.start)
+
+    async def iter_busy_spans(self, start, end, post_buffer):
+        for b in self.busy:
+            if b.start < end and b.end + post_buffer > start:
+                yield b
+
+
+def _nearest(monkeypatch, busy, after, **kwargs):
+    async def read_repo(fn, keys=()):
+        return await fn(SpanRepo(busy))
+
+    monkeypatch.setattr(schedule, "read_repo", read_repo)
+    settings = Settings(BOT_TOKEN="x", APP_TIMEZONE=TZ_NAME)
+    return asyncio.run(schedule.nearest_free_starts(after, settings, **kwargs))
+
+
+def _tomorrow(hour=0, minute=0):
+    d = datetime.now(TZ).date() + timedelta(days=1)
+    return datetime(d.year, d.month, d.day, hour, minute, tzinfo=TZ)
+
+
+def test_nearest_free_starts_honours_limit_and_after(monkeypatch):
+    day = _tomorrow()
+    starts = _nearest(monkeypatch, [], _tomorrow(10, 15), limit=3, max_days=7)
+    assert starts == [day + timedelta(hours=10, minutes=30 * k) for k in (1, 2, 3)]
+
+    busy = [TimeSlot(day + timedelta(hours=9), day + timedelta(hours=20))]
+    starts = _nearest(monkeypatch, busy, day, limit=2, max_days=7)
+    assert starts == [day + timedelta(hours=20), day + timedelta(hours=20, minutes=30)]
+
+
+def test_nearest_free_starts_stops_at_max_days_and_may_find_nothing(monkeypatch):
+    day = _tomorrow()
+    busy = [TimeSlot(day, day + timedelta(days=2))]
+    assert _nearest(monkeypatch, busy, day, limit=5, max_days=2) == []
+    assert _nearest(monkeypatch, busy, day, limit=1, max_days=3) == [
+        datetime.combine(day.date() + timedelta(days=2), time(9), tzinfo=TZ)
+    ]
+    assert _nearest(monkeypatch, [], day, limit=0, max_days=3) == []
+    assert _nearest(monkeypatch, [], day, limit=5, max_days=0) == []